@@ -0,0 +1,184 @@
+import argparse
+import json
+import random
+import sys
+from functools import partial
+from os.path import dirname, join
+from time import perf_counter_ns
+from typing import Callable, List, Dict, Optional
+
+from dealer.cards import card_codes
+from dealer.communicator import Communicator
+from dealer.hand import Hand
+from dealer.hand_scorer import get_cards_max, get_partial_hand_max, get_hand_max
+from dealer.player import Player
+
+BASELINE_PATH = join(dirname(__file__), "benchmark_baseline.json")
+SEED = 1234
+REPEATS = 5
+
+
+class NullTransport:
+    """A transport, like dealer.transport's, that throws away everything it is sent and has nothing to say."""
+
+    def send(self, data: str):
+        self.send_bytes(data.encode("utf8"))
+
+    def send_bytes(self, data: bytes):
+        pass
+
+    def recv(self, max_bytes: int, timeout: Optional[float] = None) -> str:
+        raise Exception("a showdown never asks for a reply")
+
+    def recv_bytes(self, max_bytes: int, timeout: Optional[float] = None) -> bytes:
+        return self.recv(max_bytes, timeout=timeout).encode("utf8")
+
+    def discard_pending(self) -> bytes:
+        return b""
+
+    def close(self):
+        pass
+
+
+def deal(rng: random.Random, num_hands: int, num_cards: int) -> List[List[int]]:
+    return [rng.sample(card_codes, num_cards) for _ in range(num_hands)]
+
+
+def time_calls(func: Callable, inputs: List) -> List[int]:
+    timings = []
+    for arg in inputs:
+        start = perf_counter_ns()
+        func(arg)
+        timings.append(perf_counter_ns() - start)
+    return timings
+
+
+def measure(func: Callable, make_inputs: Callable[[], List], evals_per_call=1, repeats=REPEATS) -> Dict[str, float]:
+    """Times func on fresh inputs repeats times after an untimed warm-up run and reports the fastest repeat, as
+    anything slower than that was slowed down by something other than the code being timed."""
+    time_calls(func, make_inputs())
+    timings = min((time_calls(func, make_inputs()) for _ in range(repeats)), key=sum)
+    timings.sort()
+    total = sum(timings)
+
+    def percentile(p: float) -> float:
+        return timings[min(len(timings) - 1, int(len(timings) * p))] / 1000
+
+    return {
+        "evals_per_sec": len(timings) * evals_per_call * 1e9 / total,
+        "p50_us": percentile(0.5),
+        "p90_us": percentile(0.9),
+        "p99_us": percentile(0.99),
+    }
+
+
+def bench_single(rng: random.Random, n: int, repeats: int) -> Dict[str, Dict[str, float]]:
+    return {
+        "get_cards_max[5]": measure(get_cards_max, lambda: deal(rng, n, 5), repeats=repeats),
+        "get_partial_hand_max[6]": measure(get_partial_hand_max, lambda: deal(rng, n, 6), repeats=repeats),
+        "get_hand_max[7]": measure(get_hand_max, lambda: deal(rng, n, 7), repeats=repeats),
+    }
+
+
+def bench_batch(rng: random.Random, n: int, repeats: int, batch_size=1000) -> Dict[str, Dict[str, float]]:
+    try:
+        import numpy as np
+        from dealer.batch_evaluator import evaluate_batch
+    except ImportError:
+        print("numpy is not installed, skipping batch benchmarks")
+        return {}
+
+    def make_batches(num_cards: int) -> List:
+        return [np.array(deal(rng, batch_size, num_cards)) for _ in range(max(1, n // batch_size))]
+
+    results = {}
+    for num_cards in (5, 6, 7):
+        results["evaluate_batch[{}]".format(num_cards)] = measure(evaluate_batch, partial(make_batches, num_cards),
+                                                                  evals_per_call=batch_size, repeats=repeats)
+    return results
+
+
+def make_showdown(rng: random.Random, num_players: int) -> Hand:
+    players = [Player(i, "p{}".format(i), Communicator(NullTransport(), verbose=False)) for i in range(num_players)]
+    deck = list(card_codes)
+    rng.shuffle(deck)
+    return Hand(players, deck, 0, 1, verbose=False)
+
+
+def run_showdown(hand: Hand):
+    hand.reveal_cards(3)
+    hand.reveal_cards(1)
+    hand.reveal_cards(1)
+    hand.decide_winner()
+    for player in hand.all_players:
+        player.coms.flush()
+
+
+def bench_showdown(rng: random.Random, n: int, repeats: int) -> Dict[str, Dict[str, float]]:
+    # a showdown reveals the rest of its hand's deck, so every run needs new hands
+    def make_hands(num_players: int) -> List[Hand]:
+        return [make_showdown(rng, num_players) for _ in range(max(1, n // (5 * num_players)))]
+
+    results = {}
+    for num_players in range(2, 11):
+        results["showdown[{}]".format(num_players)] = measure(run_showdown, partial(make_hands, num_players),
+                                                              repeats=repeats)
+    return results
+
+
+def run_benchmarks(n: int, repeats=REPEATS) -> Dict[str, Dict[str, float]]:
+    rng = random.Random(SEED)
+    results = {}
+    results.update(bench_single(rng, n, repeats))
+    results.update(bench_batch(rng, n * 10, repeats))
+    results.update(bench_showdown(rng, n, repeats))
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, float], threshold: float) -> List[str]:
+    regressions = []
+    for name, stats in results.items():
+        if name not in baseline:
+            continue
+        ratio = stats["evals_per_sec"] / baseline[name]
+        if ratio < 1 - threshold:
+            regressions.append("{}: {:.0f}/s is {:.0%} of baseline {:.0f}/s"
+                               .format(name, stats["evals_per_sec"], ratio, baseline[name]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the hand scorer and showdown path")
+    parser.add_argument("-n", type=int, default=20000, help="inputs per single-call benchmark")
+    parser.add_argument("--repeats", type=int, default=REPEATS,
+                        help="timed runs of each benchmark after a warm-up run, of which the fastest is reported")
+    parser.add_argument("--threshold", type=float, default=0.3,
+                        help="fail when throughput drops by more than this fraction of the baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.n, args.repeats)
+    print("{:<26}{:>14}{:>10}{:>10}{:>10}".format("benchmark", "evals/sec", "p50 us", "p90 us", "p99 us"))
+    for name, stats in results.items():
+        print("{:<26}{:>14.0f}{:>10.1f}{:>10.1f}{:>10.1f}"
+              .format(name, stats["evals_per_sec"], stats["p50_us"], stats["p90_us"], stats["p99_us"]))
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({name: round(stats["evals_per_sec"]) for name, stats in results.items()}, f, indent=2)
+            f.write("\n")
+        print("baseline written to", args.baseline)
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print("REGRESSION", regression)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
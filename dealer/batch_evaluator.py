@@ -0,0 +1,29 @@
+import numpy as np
+
+from .evaluator import RANK_OF_CODE, CODE_KEYS, FLUSH_TABLE, RANK_DISPLACE, RANK_VALUES, HASH_MULT
+
+RANKS = np.array(RANK_OF_CODE, dtype=np.int64)
+SUITS = np.arange(52, dtype=np.int64) // 13
+KEYS = np.array(CODE_KEYS, dtype=np.int64)
+BITS = np.left_shift(1, RANKS)
+
+FLUSH_RANKS = np.frombuffer(FLUSH_TABLE, dtype=np.uint32)
+DISPLACE = np.frombuffer(RANK_DISPLACE, dtype=np.uint32)
+RANK_VALUES_ARRAY = np.frombuffer(RANK_VALUES, dtype=np.uint32)
+
+
+def evaluate_batch(codes: np.ndarray) -> np.ndarray:
+    codes = np.asarray(codes, dtype=np.int64)
+    if codes.ndim != 2 or not 1 <= codes.shape[1] <= 7:
+        raise Exception("expected an (N, k) array of card codes with 1 <= k <= 7")
+
+    keys = KEYS[codes].sum(axis=1)
+    slots = (keys + DISPLACE[keys % len(DISPLACE)]) * HASH_MULT % len(RANK_VALUES_ARRAY)
+    ranks = RANK_VALUES_ARRAY[slots].astype(np.int64)
+
+    bits = BITS[codes]
+    suits = SUITS[codes]
+    for suit in range(4):
+        suit_mask = np.bitwise_or.reduce(np.where(suits == suit, bits, 0), axis=1)
+        np.maximum(ranks, FLUSH_RANKS[suit_mask], out=ranks)
+    return ranks
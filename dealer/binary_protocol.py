@@ -0,0 +1,257 @@
+from typing import List, Tuple
+
+# A frame is a varint payload length followed by the payload: one message type byte and then the message's fields.
+# Amounts and counts are unsigned varints, cards are a count byte followed by one card code byte each and strings
+# are a varint length followed by utf8. The name of the player the message is sent to is written as "".
+
+WELCOME = 0
+NEW_HAND = 1
+PLAYERS_IN = 2
+MONEY = 3
+BLINDS = 4
+YOUR_BLIND = 5
+HAND = 6
+REVEAL = 7
+STATUS = 8
+OPTIONS = 9
+SUCCESS = 10
+ERROR = 11
+AUTO_ACTION = 12
+OPPONENT_ACTION = 13
+CANNOT_BET = 14
+RESULTS = 15
+POTS = 16
+WINNINGS = 17
+OUT_OF_MONEY = 18
+CHAMPION = 19
+GOODBYE = 20
+ACTION = 21
+NEW_GAME = 22
+
+# field codes: v varint, b byte, s string, c cards, S list of strings, [...] list of records with those fields
+SCHEMAS = {
+    WELCOME: "s",
+    NEW_HAND: "v",
+    PLAYERS_IN: "S",
+    MONEY: "[sv]",
+    BLINDS: "vv",
+    YOUR_BLIND: "b",
+    HAND: "c",
+    REVEAL: "c",
+    STATUS: "vvvv",
+    OPTIONS: "b",
+    SUCCESS: "",
+    ERROR: "s",
+    AUTO_ACTION: "bs",
+    OPPONENT_ACTION: "sbvv",
+    CANNOT_BET: "b",
+    RESULTS: "[sv]",
+    POTS: "[Svvv]",
+    WINNINGS: "[sv]",
+    OUT_OF_MONEY: "",
+    CHAMPION: "",
+    GOODBYE: "",
+    ACTION: "bv",
+    NEW_GAME: "v",
+}
+
+FOLD = 0
+CALL = 1
+RAISE = 2
+ACTION_NAMES = ["Fold", "Call", "Raise"]
+ACTION_CODES = {name: code for code, name in enumerate(ACTION_NAMES)}
+
+NOT_BLIND = 0
+SMALL_BLIND = 1
+BIG_BLIND = 2
+
+FOLDED = 0
+ALL_IN = 1
+
+
+def parse_schema(schema: str) -> List:
+    fields = []
+    i = 0
+    while i < len(schema):
+        if schema[i] == "[":
+            end = schema.index("]", i)
+            fields.append(schema[i + 1:end])
+            i = end + 1
+        else:
+            fields.append(schema[i])
+            i += 1
+    return fields
+
+
+FIELDS = {msg_type: parse_schema(schema) for msg_type, schema in SCHEMAS.items()}
+
+
+def write_varint(out: bytearray, n: int):
+    if n < 0:
+        raise Exception("varints cannot be negative: {}".format(n))
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def read_varint(data, pos: int) -> Tuple[int, int]:
+    byte = data[pos]
+    if byte < 0x80:
+        return byte, pos + 1
+    n = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+
+def write_byte(out: bytearray, value: int):
+    out.append(value)
+
+
+def read_byte(data, pos: int) -> Tuple[int, int]:
+    return data[pos], pos + 1
+
+
+def write_string(out: bytearray, value: str):
+    encoded = value.encode("utf8")
+    write_varint(out, len(encoded))
+    out += encoded
+
+
+def read_string(data, pos: int) -> Tuple[str, int]:
+    length, pos = read_varint(data, pos)
+    return data[pos:pos + length].decode("utf8"), pos + length
+
+
+def write_cards(out: bytearray, value: List[int]):
+    out.append(len(value))
+    out += bytes(value)
+
+
+def read_cards(data, pos: int) -> Tuple[List[int], int]:
+    end = pos + 1 + data[pos]
+    return list(data[pos + 1:end]), end
+
+
+def write_strings(out: bytearray, value: List[str]):
+    write_varint(out, len(value))
+    for s in value:
+        write_string(out, s)
+
+
+def read_strings(data, pos: int) -> Tuple[List[str], int]:
+    count, pos = read_varint(data, pos)
+    strings = []
+    for _ in range(count):
+        s, pos = read_string(data, pos)
+        strings.append(s)
+    return strings, pos
+
+
+WRITERS = {"v": write_varint, "b": write_byte, "s": write_string, "c": write_cards, "S": write_strings}
+READERS = {"v": read_varint, "b": read_byte, "s": read_string, "c": read_cards, "S": read_strings}
+
+
+def record_writer(codes: str):
+    writers = [WRITERS[code] for code in codes]
+
+    def write_records(out: bytearray, records: List[Tuple]):
+        write_varint(out, len(records))
+        for record in records:
+            for writer, value in zip(writers, record):
+                writer(out, value)
+    return write_records
+
+
+def record_reader(codes: str):
+    readers = [READERS[code] for code in codes]
+
+    def read_records(data, pos: int) -> Tuple[List[Tuple], int]:
+        count, pos = read_varint(data, pos)
+        records = []
+        for _ in range(count):
+            record = []
+            for reader in readers:
+                value, pos = reader(data, pos)
+                record.append(value)
+            records.append(tuple(record))
+        return records, pos
+    return read_records
+
+
+# the field functions for each message type are looked up once here rather than per field when coding
+ENCODERS = {msg_type: [WRITERS[f] if len(f) == 1 else record_writer(f) for f in fields]
+            for msg_type, fields in FIELDS.items()}
+DECODERS = {msg_type: [READERS[f] if len(f) == 1 else record_reader(f) for f in fields]
+            for msg_type, fields in FIELDS.items()}
+
+
+def encode(msg_type: int, *values) -> bytearray:
+    payload = bytearray([msg_type])
+    for writer, value in zip(ENCODERS[msg_type], values):
+        writer(payload, value)
+    frame = bytearray()
+    write_varint(frame, len(payload))
+    frame += payload
+    return frame
+
+
+def decode(payload: bytes) -> Tuple:
+    msg_type = payload[0]
+    values = [msg_type]
+    pos = 1
+    for reader in DECODERS[msg_type]:
+        value, pos = reader(payload, pos)
+        values.append(value)
+    return tuple(values)
+
+
+def split_frames(buffer: bytearray) -> List[bytearray]:
+    """Removes and returns the payloads of all the complete frames at the start of the buffer."""
+    payloads = []
+    pos = 0
+    size = len(buffer)
+    while pos < size:
+        length = buffer[pos]
+        if length < 0x80:
+            start = pos + 1
+        else:
+            try:
+                length, start = read_varint(buffer, pos)
+            except IndexError:
+                break
+        end = start + length
+        if size < end:
+            break
+        payloads.append(buffer[start:end])
+        pos = end
+    del buffer[:pos]
+    return payloads
+
+
+def encode_action(action: str) -> bytearray:
+    parts = action.split(" ")
+    code = ACTION_CODES.get(parts[0], 255)
+    amount = int(parts[1]) if code == RAISE and len(parts) > 1 else 0
+    return encode(ACTION, code, amount)
+
+
+def decode_action(payload: bytes) -> str:
+    """Turns an ACTION frame back into the text action the dealer validates, or "" if it is not a valid one."""
+    if len(payload) == 0 or payload[0] != ACTION:
+        return ""
+    try:
+        _, code, amount = decode(payload)
+    except IndexError:
+        return ""
+    if code == RAISE:
+        return "Raise {}".format(amount)
+    elif code < len(ACTION_NAMES):
+        return ACTION_NAMES[code]
+    return ""
@@ -1,3 +1,6 @@
+from typing import Iterable, List
+
+
 class Card:
 
     def __init__(self, code: int, name: str):
@@ -15,4 +18,22 @@ deck = [Card(*c) for c in enumerate(card_names)]
 
 card_name_lookup = {card.name: card for card in deck}
 card_code_lookup = {card.code: card for card in deck}
+card_codes = [card.code for card in deck]
+
+full_deck_mask = (1 << 52) - 1
+
+
+def card_mask(codes: Iterable[int]) -> int:
+    mask = 0
+    for code in codes:
+        mask |= 1 << code
+    return mask
+
 
+def mask_codes(mask: int) -> List[int]:
+    codes = []
+    while mask:
+        low = mask & -mask
+        codes.append(low.bit_length() - 1)
+        mask ^= low
+    return codes
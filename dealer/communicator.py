@@ -1,39 +1,311 @@
-from typing import List
-from .cards import Card
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+from .cards import card_code_lookup
+from . import binary_protocol as bp
 
 
-def format_cards(cards: List[Card]) -> str:
-    # return " ".join(["{:02d}".format(cards.py.code) for cards.py in cards])
-    return ", ".join([card.name for card in cards])
+def format_cards(cards: List[int]) -> str:
+    return ", ".join([card_code_lookup[card].name for card in cards])
+
+
+def parse_join(reply: str) -> Tuple[str, bool]:
+    """Splits a lobby name reply into the name and whether the player asked for the binary protocol."""
+    if reply.endswith(" binary"):
+        return reply[:-len(" binary")], True
+    return reply, False
+
+
+def time_left(deadline: Optional[float]) -> Optional[float]:
+    if deadline is None:
+        return None
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise TimeoutError("no reply in time")
+    return left
+
+
+def you(name: str, recipient: Optional[str], capital=True) -> str:
+    if name != recipient:
+        return name
+    return "You" if capital else "you"
 
 
 class Communicator:
- 
-    def __init__(self, conn, verbose=True):
-        self.conn = conn
+    """Outgoing text is buffered and written in one go when the player next needs to reply, or on flush/close.
+
+    The lists of money, results and winnings passed to the send_* methods are built once and sent to everyone, so
+    each Communicator writes its own player's entry as "You".
+
+    When recv_action times out, a reply to those options may still turn up, or never come. So before the next
+    options go out, whatever the player has already sent is thrown away, without waiting for anything more.
+    """
+
+    def __init__(self, transport, verbose=True):
+        self.transport = transport
         self.name = None
         self.verbose = verbose
- 
+        self._outgoing: List[str] = []
+        self._incoming = ""
+        self.missed_reply = False
+
     def send(self, d: str, verbose=True):
         if self.verbose and verbose:
             print("sending to {}: {}".format(self.name, d), end="")
-        self.conn.send(d.encode("utf8"))
- 
+        self._outgoing.append(d)
+
+    def flush(self):
+        if len(self._outgoing) > 0:
+            data = "".join(self._outgoing)
+            self._outgoing = []
+            self.transport.send(data)
+
     def send_line(self, d: str, verbose=True):
         self.send(d + "\n", verbose=verbose)
- 
-    def send_hand(self, hand: List[Card]):
+
+    def send_welcome(self, name: str):
+        self.send("Hi %s, please wait to be dealt your hand\n" % name)
+
+    def send_new_hand(self, round_num: int):
+        self.send_line("---- New Hand :: Round {} ----".format(round_num), verbose=False)
+
+    def send_players_in(self, names: List[str]):
+        self.send_line("The following players are still in: " + ", ".join(names), verbose=False)
+
+    def send_money(self, holdings: List[Tuple[str, int]]):
+        lines = ["Money left"]
+        for name, amount in holdings:
+            lines.append("{}: {}".format(you(name, self.name), amount))
+        self.send_line("\n".join(lines), verbose=False)
+
+    def send_blinds(self, big_blind: int, small_blind: int):
+        self.send_line("Big blind is {}".format(big_blind), verbose=False)
+        self.send_line("Small blind is {}".format(small_blind), verbose=False)
+
+    def send_your_blind(self, blind: int):
+        if blind == bp.BIG_BLIND:
+            self.send_line("You are big blind")
+        elif blind == bp.SMALL_BLIND:
+            self.send_line("You are small blind")
+        else:
+            self.send_line("You are not the blind", verbose=False)
+
+    def send_hand(self, hand: List[int]):
         self.send_line("Hand\n" + format_cards(hand))
- 
-    def send_card_reveal(self, reveals: List[Card]):
+
+    def send_card_reveal(self, reveals: List[int]):
         self.send_line("Reveal {}\n{}".format(len(reveals), format_cards(reveals)))
- 
-    def recv(self, d: int, verbose=True) -> str:
-        msg = self.conn.recv(d).decode("utf8").strip()
+
+    def send_status(self, pot: int, pot_bet: int, your_bet: int, holdings: int):
+        self.send_line("Current pot: {}\nCurrent pot bet: {}\nYour current bet: {}\nYour holdings: {}"
+                       .format(pot, pot_bet, your_bet, holdings))
+
+    def send_options(self, options: List[str]):
+        self.send_line("/".join(options))
+
+    def send_success(self):
+        self.send_line("SUCCESS")
+
+    def send_error(self, message: str):
+        self.send_line("ERROR: {}".format(message))
+
+    def send_auto_action(self, action: str, reason: str):
+        self.send_line("Auto action: {} ({})".format(action, reason))
+
+    def send_opponent_action(self, name: str, action: str, raise_amount: int, bet: int):
+        if action == "Fold":
+            display = "Folded"
+        elif action == "Call":
+            display = "Called"
+        else:
+            display = "Raised by {} to {}".format(raise_amount, bet)
+        self.send_line("Opponent action: {} {}".format(name, display), verbose=False)
+
+    def send_cannot_bet(self, reason: int):
+        if reason == bp.FOLDED:
+            self.send_line("You have folded so cannot bet")
+        else:
+            self.send_line("You have no more money so cannot bet")
+
+    def send_results(self, results: List[Tuple[str, int, str]]):
+        # everyone else's result in score order, followed by your own
+        lines = ["Results [{}]".format(len(results))]
+        own = None
+        for name, _, description in results:
+            if name == self.name:
+                own = description
+            else:
+                lines.append(name + " got " + description)
+        if own is not None:
+            lines.append("You got " + own)
+        self.send_line("\n".join(lines), verbose=False)
+
+    def send_pots(self, pots: List[Tuple[List[str], int, int, int]]):
+        lines = ["Pots [{}]".format(len(pots))]
+        for winners, bet, amount, share in pots:
+            lines.append("{} win {} bet pot worth {} giving {} each".format(", ".join(winners), bet, amount, share))
+        self.send_line("\n".join(lines), verbose=False)
+
+    def send_winnings(self, winnings: List[Tuple[str, int]]):
+        lines = ["Winnings"]
+        for name, amount in winnings:
+            lines.append("In total {} won {}".format(you(name, self.name, capital=False), amount))
+        self.send_line("\n".join(lines), verbose=False)
+
+    def send_out_of_money(self):
+        self.send_line("You ran out of money")
+
+    def send_champion(self):
+        self.send_line("YOU ARE THE CHAMPION")
+
+    def send_new_game(self, game_num: int):
+        self.send_line("New game: {}".format(game_num))
+
+    def recv(self, d: int, verbose=True, timeout: Optional[float] = None) -> str:
+        self.flush()
+        msg = self.transport.recv(d, timeout=timeout).strip()
         if self.verbose and verbose:
             print("received from {}: {}".format(self.name, msg))
         return msg
 
+    def recv_action(self, timeout: Optional[float] = None) -> str:
+        if self.missed_reply:
+            self.discard_pending()
+            self.missed_reply = False
+        self.flush()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            action = self.recv_reply(deadline)
+        except TimeoutError:
+            self.missed_reply = True
+            raise
+        if self.verbose:
+            print("received from {}: {}".format(self.name, action))
+        return action
+
+    def discard_pending(self):
+        discarded = self._incoming + self.transport.discard_pending().decode("utf8", "replace")
+        self._incoming = ""
+        if self.verbose and discarded:
+            print("discarded late reply from {}: {}".format(self.name, discarded.strip()))
+
+    def recv_reply(self, deadline: Optional[float]) -> str:
+        while "\n" not in self._incoming:
+            data = self.transport.recv(4096, timeout=time_left(deadline))
+            if len(data) == 0:
+                raise Exception("Connection is closed")
+            self._incoming += data
+        line, _, self._incoming = self._incoming.partition("\n")
+        return line.strip()
+
     def close(self):
         self.send_line("Goodbye")
-        self.conn.close()
+        self.flush()
+        self.transport.close()
+
+
+class BinaryCommunicator(Communicator):
+    """Speaks the framed binary protocol in binary_protocol, for bots that asked for it when joining."""
+
+    def __init__(self, transport, verbose=True):
+        super().__init__(transport, verbose=verbose)
+        self._frames = bytearray()
+        self._incoming = bytearray()
+        self._payloads = deque()
+
+    def send_message(self, msg_type: int, *values):
+        if self.verbose:
+            print("sending to {}: {}".format(self.name, (msg_type,) + values))
+        self._frames += bp.encode(msg_type, *values)
+
+    def send(self, d: str, verbose=True):
+        raise Exception("cannot send free text to a binary protocol player: " + d)
+
+    def flush(self):
+        if len(self._frames) > 0:
+            data = bytes(self._frames)
+            self._frames.clear()
+            self.transport.send_bytes(data)
+
+    def send_welcome(self, name: str):
+        self.send_message(bp.WELCOME, name)
+
+    def send_new_hand(self, round_num: int):
+        self.send_message(bp.NEW_HAND, round_num)
+
+    def send_players_in(self, names: List[str]):
+        self.send_message(bp.PLAYERS_IN, names)
+
+    def send_money(self, holdings: List[Tuple[str, int]]):
+        self.send_message(bp.MONEY, [("" if name == self.name else name, amount) for name, amount in holdings])
+
+    def send_blinds(self, big_blind: int, small_blind: int):
+        self.send_message(bp.BLINDS, big_blind, small_blind)
+
+    def send_your_blind(self, blind: int):
+        self.send_message(bp.YOUR_BLIND, blind)
+
+    def send_hand(self, hand: List[int]):
+        self.send_message(bp.HAND, hand)
+
+    def send_card_reveal(self, reveals: List[int]):
+        self.send_message(bp.REVEAL, reveals)
+
+    def send_status(self, pot: int, pot_bet: int, your_bet: int, holdings: int):
+        self.send_message(bp.STATUS, pot, pot_bet, your_bet, holdings)
+
+    def send_options(self, options: List[str]):
+        self.send_message(bp.OPTIONS, int("Raise" in options))
+
+    def send_success(self):
+        self.send_message(bp.SUCCESS)
+
+    def send_error(self, message: str):
+        self.send_message(bp.ERROR, message)
+
+    def send_auto_action(self, action: str, reason: str):
+        self.send_message(bp.AUTO_ACTION, bp.ACTION_CODES[action], reason)
+
+    def send_opponent_action(self, name: str, action: str, raise_amount: int, bet: int):
+        self.send_message(bp.OPPONENT_ACTION, name, bp.ACTION_CODES[action], raise_amount, bet)
+
+    def send_cannot_bet(self, reason: int):
+        self.send_message(bp.CANNOT_BET, reason)
+
+    def send_results(self, results: List[Tuple[str, int, str]]):
+        self.send_message(bp.RESULTS, [(name, rank) for name, rank, _ in results if name != self.name] +
+                          [("", rank) for name, rank, _ in results if name == self.name])
+
+    def send_pots(self, pots: List[Tuple[List[str], int, int, int]]):
+        self.send_message(bp.POTS, pots)
+
+    def send_winnings(self, winnings: List[Tuple[str, int]]):
+        self.send_message(bp.WINNINGS, [("" if name == self.name else name, amount) for name, amount in winnings])
+
+    def send_out_of_money(self):
+        self.send_message(bp.OUT_OF_MONEY)
+
+    def send_champion(self):
+        self.send_message(bp.CHAMPION)
+
+    def send_new_game(self, game_num: int):
+        self.send_message(bp.NEW_GAME, game_num)
+
+    def discard_pending(self):
+        self.transport.discard_pending()
+        self._incoming.clear()
+        self._payloads.clear()
+
+    def recv_reply(self, deadline: Optional[float]) -> str:
+        while len(self._payloads) == 0:
+            data = self.transport.recv_bytes(4096, timeout=time_left(deadline))
+            if len(data) == 0:
+                raise Exception("Connection is closed")
+            self._incoming += data
+            self._payloads.extend(bp.split_frames(self._incoming))
+        return bp.decode_action(self._payloads.popleft())
+
+    def close(self):
+        self.send_message(bp.GOODBYE)
+        self.flush()
+        self.transport.close()
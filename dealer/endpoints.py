@@ -0,0 +1,126 @@
+import os
+import socket
+import stat
+from typing import List, Optional, Tuple
+
+# Where the dealer listens and players connect, as one of
+#   tcp://host:port   port 0 lets the OS pick a free port, see endpoint_of for the one it picked
+#   unix:///path      a unix domain socket, for bots on the same machine as the dealer
+#   fd://N            a socket the process inherited, e.g. one end of a socketpair made by the process that started it
+# Both sides read DEALER_ENDPOINT when no endpoint is given, falling back to port 8080 on the local network address.
+ENDPOINT_VARIABLE = "DEALER_ENDPOINT"
+DEFAULT_PORT = 8080
+
+
+def get_local_ip() -> str:
+    address_list = socket.gethostbyname_ex(socket.gethostname())[2]
+    ip_addresses = [a for a in address_list if a.startswith("192.168.1.")]
+    if len(ip_addresses) < 1:
+        raise Exception("Could not find an address that looks like a local ip")
+    return ip_addresses[0]
+
+
+def default_endpoint() -> str:
+    endpoint = os.environ.get(ENDPOINT_VARIABLE)
+    if endpoint is None:
+        endpoint = "tcp://{}:{}".format(get_local_ip(), DEFAULT_PORT)
+    return endpoint
+
+
+def parse_endpoint(endpoint: str) -> Tuple[str, object]:
+    scheme, sep, address = endpoint.partition("://")
+    if sep == "":
+        raise Exception("endpoint needs a scheme, e.g. tcp://host:port: " + endpoint)
+    if scheme == "tcp":
+        host, _, port = address.rpartition(":")
+        return scheme, (host, int(port))
+    elif scheme == "unix":
+        return scheme, address
+    elif scheme == "fd":
+        return scheme, int(address)
+    raise Exception("unknown endpoint scheme: " + endpoint)
+
+
+def listen(endpoint: Optional[str] = None) -> socket.socket:
+    if endpoint is None:
+        endpoint = default_endpoint()
+    scheme, address = parse_endpoint(endpoint)
+    if scheme == "tcp":
+        s = socket.socket()
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    elif scheme == "unix":
+        if os.path.exists(address) and stat.S_ISSOCK(os.stat(address).st_mode):
+            if is_listening(address):
+                raise Exception("a dealer is already listening at " + endpoint)
+            os.unlink(address)  # left behind by a dealer that did not shut down cleanly
+        s = socket.socket(socket.AF_UNIX)
+    else:
+        raise Exception("can only listen on tcp or unix endpoints: " + endpoint)
+    s.bind(address)
+    s.listen()
+    return s
+
+
+def is_listening(path: str) -> bool:
+    probe = socket.socket(socket.AF_UNIX)
+    try:
+        probe.connect(path)
+    except ConnectionRefusedError:
+        return False
+    finally:
+        probe.close()
+    return True
+
+
+def socket_file(s: socket.socket) -> Optional[str]:
+    return (s.getsockname() or None) if s.family == socket.AF_UNIX else None
+
+
+def close_listener(s: socket.socket):
+    """Closes a socket from listen, removing the file of a unix one so the path can be reused."""
+    path = socket_file(s)
+    s.close()
+    if path is not None:
+        remove_socket_file(path)
+
+
+def remove_socket_file(path: str):
+    if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+        os.unlink(path)
+
+
+def connect(endpoint: Optional[str] = None) -> socket.socket:
+    if endpoint is None:
+        endpoint = default_endpoint()
+    scheme, address = parse_endpoint(endpoint)
+    if scheme == "tcp":
+        return socket.create_connection(address)
+    elif scheme == "unix":
+        s = socket.socket(socket.AF_UNIX)
+        s.connect(address)
+        return s
+    else:
+        return socket.socket(fileno=address)
+
+
+def endpoint_of(s: socket.socket) -> str:
+    if s.family == socket.AF_UNIX:
+        return "unix://" + s.getsockname()
+    host, port = s.getsockname()[:2]
+    return "tcp://{}:{}".format(host, port)
+
+
+def socketpairs(num: int) -> Tuple[List[socket.socket], List[socket.socket]]:
+    """Connected pairs for bots the dealer starts itself: it keeps the first list and hands each bot an fd:// endpoint
+    for its socket in the second, which is inheritable so it survives into a child process."""
+    dealer_ends, player_ends = [], []
+    for _ in range(num):
+        dealer_end, player_end = socket.socketpair()
+        player_end.set_inheritable(True)
+        dealer_ends.append(dealer_end)
+        player_ends.append(player_end)
+    return dealer_ends, player_ends
+
+
+def fd_endpoint(s: socket.socket) -> str:
+    return "fd://{}".format(s.fileno())
@@ -0,0 +1,223 @@
+import hashlib
+import inspect
+import os
+from array import array
+from itertools import combinations_with_replacement
+from os.path import dirname, join
+from typing import List, Dict, Iterable, Tuple
+
+from .shared_tables import load_tables
+
+# Ranks run from 0 (two) to 12 (ace), so that a higher rank is a better card.
+# Card codes number Ace as 0 within a suit, hence the shift.
+RANK_OF_CODE: List[int] = [(code % 13 - 1) % 13 for code in range(52)]
+SUIT_OF_CODE: List[int] = [code // 13 for code in range(52)]
+
+# A rank multiset is keyed by sum(5 ** rank) over its cards. A rank can appear at most 4 times
+# so the key is a base-5 number with one digit per rank, which makes it unique and additive.
+RANK_KEYS: List[int] = [5 ** rank for rank in range(13)]
+CODE_KEYS: List[int] = [RANK_KEYS[rank] for rank in RANK_OF_CODE]
+CODE_BITS: List[int] = [1 << rank for rank in RANK_OF_CODE]
+
+HIGH_CARD = 0
+PAIR = 1
+TWO_PAIR = 2
+THREE_OF_A_KIND = 3
+STRAIGHT = 4
+FLUSH = 5
+FULL_HOUSE = 6
+FOUR_OF_A_KIND = 7
+STRAIGHT_FLUSH = 8
+
+TRICK_NAMES = ["High card", "2 of a kind", "Two pairs", "3 of a kind", "Straight", "Flush", "Full house",
+               "4 of a kind", "Straight flush"]
+
+WHEEL = (1 << 12) | 0b1111
+STRAIGHTS = [(0b11111 << low, low + 4) for low in reversed(range(9))] + [(WHEEL, 3)]
+
+
+def pack_rank(trick_code: int, ranks: List[int]) -> int:
+    value = trick_code
+    for i in range(5):
+        value = (value << 4) | (ranks[i] if i < len(ranks) else 0)
+    return value
+
+
+MAX_RANK = pack_rank(STRAIGHT_FLUSH, [12])
+
+
+def rank_trick_code(rank: int) -> int:
+    return rank >> 20
+
+
+def rank_cards(rank: int) -> List[int]:
+    return [(rank >> shift) & 0xF for shift in (16, 12, 8, 4, 0)]
+
+
+def straight_high(mask: int) -> int:
+    for straight, high in STRAIGHTS:
+        if mask & straight == straight:
+            return high
+    return -1
+
+
+def top_ranks(mask: int, n: int) -> List[int]:
+    return [rank for rank in reversed(range(13)) if mask >> rank & 1][:n]
+
+
+def score_flush(mask: int) -> int:
+    high = straight_high(mask)
+    if high >= 0:
+        return pack_rank(STRAIGHT_FLUSH, [high])
+    return pack_rank(FLUSH, top_ranks(mask, 5))
+
+
+def score_counts(counts: List[int]) -> int:
+    mask = 0
+    for rank in range(13):
+        if counts[rank]:
+            mask |= 1 << rank
+    by_count = [[rank for rank in reversed(range(13)) if counts[rank] == n] for n in range(5)]
+    quads, trips, pairs = by_count[4], by_count[3], by_count[2]
+
+    def kickers(exclude: List[int], n: int) -> List[int]:
+        return [rank for rank in reversed(range(13)) if counts[rank] and rank not in exclude][:n]
+
+    if quads:
+        return pack_rank(FOUR_OF_A_KIND, [quads[0]] + kickers(quads[:1], 1))
+    if trips and len(trips) + len(pairs) > 1:
+        pair = max(trips[1:] + pairs)
+        return pack_rank(FULL_HOUSE, [trips[0], pair])
+    high = straight_high(mask)
+    if high >= 0:
+        return pack_rank(STRAIGHT, [high])
+    if trips:
+        return pack_rank(THREE_OF_A_KIND, [trips[0]] + kickers(trips, 2))
+    if len(pairs) > 1:
+        return pack_rank(TWO_PAIR, pairs[:2] + kickers(pairs[:2], 1))
+    if pairs:
+        return pack_rank(PAIR, pairs[:1] + kickers(pairs, 3))
+    return pack_rank(HIGH_CARD, kickers([], 5))
+
+
+def build_flush_table() -> List[int]:
+    table = [0] * (1 << 13)
+    for mask in range(1 << 13):
+        if bin(mask).count("1") >= 5:
+            table[mask] = score_flush(mask)
+    return table
+
+
+def build_rank_table(max_cards=7) -> Dict[int, int]:
+    table = {}
+    for n in range(1, max_cards + 1):
+        for ranks in combinations_with_replacement(range(13), n):
+            counts = [0] * 13
+            for rank in ranks:
+                counts[rank] += 1
+            if max(counts) > 4:
+                continue
+            table[sum(RANK_KEYS[rank] for rank in ranks)] = score_counts(counts)
+    return table
+
+
+# The rank table is stored as a perfect hash: a key's bucket holds a displacement that moves every key in
+# that bucket to its own slot, so lookups index two flat arrays that can be shared between processes.
+HASH_MULT = 0x7F4A7C15
+
+
+def build_rank_hash(rank_table: Dict[int, int]) -> Tuple[array, array]:
+    num_buckets = len(rank_table) // 4
+    num_slots = len(rank_table) * 5 // 4
+    buckets: List[List[int]] = [[] for _ in range(num_buckets)]
+    for key in rank_table:
+        buckets[key % num_buckets].append(key)
+
+    displace = array("I", [0]) * num_buckets
+    values = array("I", [0]) * num_slots
+    used = bytearray(num_slots)
+    for bucket in sorted(range(num_buckets), key=lambda b: -len(buckets[b])):
+        keys = buckets[bucket]
+        d = 0
+        while True:
+            slots = [(key + d) * HASH_MULT % num_slots for key in keys]
+            if len(set(slots)) == len(slots) and not any(used[slot] for slot in slots):
+                break
+            d += 1
+        displace[bucket] = d
+        for key, slot in zip(keys, slots):
+            used[slot] = 1
+            values[slot] = rank_table[key]
+    return displace, values
+
+
+def build_tables() -> Dict[str, array]:
+    displace, values = build_rank_hash(build_rank_table())
+    return {"flush": array("I", build_flush_table()), "rank_displace": displace, "rank_values": values}
+
+
+def tables_version() -> bytes:
+    """A hash of the code and constants the tables are built from, so a file cached by an older build is rebuilt."""
+    builders = [pack_rank, straight_high, top_ranks, score_flush, score_counts, build_flush_table, build_rank_table,
+                build_rank_hash, build_tables]
+    source = "".join(inspect.getsource(builder) for builder in builders)
+    source += repr((RANK_KEYS, STRAIGHTS, HASH_MULT))
+    return hashlib.sha1(source.encode("utf8")).digest()[:8]
+
+
+# FLUSH_TABLE holds the best hand for the ranks of a single suit holding 5 or more cards.
+# RANK_VALUES holds the best hand ignoring suits, for every multiset of up to 7 ranks.
+TABLES_PATH = os.environ.get("DEALER_TABLES", join(dirname(__file__), "evaluator_tables.bin"))
+TABLES = load_tables(TABLES_PATH, b"EVT2", build_tables, tables_version())
+FLUSH_TABLE = TABLES["flush"]
+RANK_DISPLACE = TABLES["rank_displace"]
+RANK_VALUES = TABLES["rank_values"]
+RANK_BUCKETS = len(RANK_DISPLACE)
+RANK_SLOTS = len(RANK_VALUES)
+
+
+def lookup_ranks(key: int) -> int:
+    return RANK_VALUES[(key + RANK_DISPLACE[key % RANK_BUCKETS]) * HASH_MULT % RANK_SLOTS]
+
+
+def evaluate(codes: Iterable[int]) -> int:
+    key = 0
+    suit_masks = [0, 0, 0, 0]
+    for code in codes:
+        key += CODE_KEYS[code]
+        suit_masks[SUIT_OF_CODE[code]] |= CODE_BITS[code]
+    ranks = RANK_VALUES[(key + RANK_DISPLACE[key % RANK_BUCKETS]) * HASH_MULT % RANK_SLOTS]
+    return max(ranks, FLUSH_TABLE[suit_masks[0]], FLUSH_TABLE[suit_masks[1]],
+               FLUSH_TABLE[suit_masks[2]], FLUSH_TABLE[suit_masks[3]])
+
+
+class IncrementalEvaluator:
+    __slots__ = ["key", "suit_masks", "num_cards", "best"]
+
+    def __init__(self, codes: Iterable[int] = ()):
+        self.key = 0
+        self.suit_masks = [0, 0, 0, 0]
+        self.num_cards = 0
+        self.best = 0
+        for code in codes:
+            self.push(code)
+
+    def push(self, code: int):
+        # Adding a card can only improve the best hand, so only the new rank multiset and the suit it
+        # landed in need looking up.
+        suit = SUIT_OF_CODE[code]
+        self.key += CODE_KEYS[code]
+        self.suit_masks[suit] |= CODE_BITS[code]
+        self.num_cards += 1
+        self.best = max(self.best, lookup_ranks(self.key), FLUSH_TABLE[self.suit_masks[suit]])
+
+    def copy(self) -> "IncrementalEvaluator":
+        other = IncrementalEvaluator()
+        other.key = self.key
+        other.suit_masks = list(self.suit_masks)
+        other.num_cards = self.num_cards
+        other.best = self.best
+        return other
+
+    def __repr__(self):
+        return "IncrementalEvaluator(cards={}, best={})".format(self.num_cards, self.best)
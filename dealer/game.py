@@ -1,24 +1,39 @@
 import random
-from typing import List
+import time
+from typing import List, Optional
 
 from .hand import Hand
+from .history import HandHistoryWriter
+from .limits import ActionLimits
+from .metrics import DealerMetrics
 from .player import Player
-from .cards import deck
+from .cards import card_codes
 
 
 class Game:
  
-    def __init__(self, players: List[Player], verbose=True):
+    def __init__(self, players: List[Player], verbose=True, seed: Optional[int] = None,
+                 recorder: Optional[HandHistoryWriter] = None, limits: Optional[ActionLimits] = None,
+                 close_players=True, metrics: Optional[DealerMetrics] = None):
  
         self.players_still_in = list(players)
  
-        self.deck = list(deck)
-        random.shuffle(self.deck)
+        self.rng = random.Random(seed)
+        self.deck = list(card_codes)
+        self.rng.shuffle(self.deck)
         
         self.start_pos = 0
         self.round_num = 1
 
         self.verbose = verbose
+        self.recorder = recorder
+        self.limits = limits
+        self.metrics = metrics
+        # a Match keeps the connections open for its next game, so players who are out are only told so
+        self.close_players = close_players
+        if limits is not None:
+            for player in self.players_still_in:
+                player.time_bank = limits.time_bank
 
         if verbose:
             print("new game started")
@@ -27,13 +42,18 @@ class Game:
         return len(self.players_still_in) < 2
  
     def run_hand(self):
-        hand = Hand(self.players_still_in, self.deck, self.start_pos, self.round_num, verbose=self.verbose)
+        if self.metrics is not None:
+            started = time.perf_counter()
+        hand = Hand(self.players_still_in, self.deck, self.start_pos, self.round_num, verbose=self.verbose,
+                    recorder=self.recorder, limits=self.limits, metrics=self.metrics)
         hand.run()
+        if self.metrics is not None:
+            self.metrics.hand_finished(time.perf_counter() - started)
 
         bust_players = [player for player in self.players_still_in if not player.has_money()]
         for player in bust_players:
-            player.coms.send_line("You ran out of money")
-            player.coms.close()
+            player.coms.send_out_of_money()
+            self.dismiss(player)
 
         self.players_still_in = [player for player in self.players_still_in if player.has_money()]
         self.inc_start_position()
@@ -52,7 +72,13 @@ class Game:
         if len(self.players_still_in) > 1:
             print("no-one has won yet")
         else:
-            winner_coms = self.players_still_in[0].coms
-            winner_coms.send_line("YOU ARE THE CHAMPION")
-            winner_coms.close()
+            winner = self.players_still_in[0]
+            winner.coms.send_champion()
+            self.dismiss(winner)
+
+    def dismiss(self, player: Player):
+        if self.close_players:
+            player.coms.close()
+        else:
+            player.coms.flush()
 
@@ -1,17 +1,24 @@
-from typing import List, Tuple, Set
+import time
+from typing import List, Tuple, Set, Optional
 
 from .player import Player
-from .hand_scorer import get_hand_max, Score
-from .cards import Card
+from .hand_scorer import describe_hand
+from .evaluator import IncrementalEvaluator
+from .history import HandHistoryWriter, HandRecord, BLIND, ACTION_CODES, STREETS
+from .limits import ActionLimits
+from .metrics import DealerMetrics
+from . import binary_protocol as bp
 
 
 class HandPlayer(Player):
 
-    def __init__(self, player: Player, hand: List[Card]):
+    def __init__(self, player: Player, hand: List[int]):
         super().__init__(player.ID, player.name, player.coms, player.holdings)
         self.bet_amount = 0
         self.folded = False
         self.hand = hand
+        self.evaluator = IncrementalEvaluator(hand)
+        self.time_bank = player.time_bank
 
     def bet(self, amount: int):
         super().bet(amount)
@@ -43,18 +50,29 @@ class Bet:
 
 
 class Bets(dict):
+    """The bets made in one betting round, keyed by player ID, with the running total and maximum kept up to date."""
+
+    def __init__(self):
+        super().__init__()
+        self.total = 0
+        self.max_amount = 0
+
+    def add(self, player: HandPlayer, amount: int):
+        if player.ID in self:
+            self[player.ID].amount += amount
+        else:
+            self[player.ID] = Bet(amount, player)
+        self.total += amount
+        self.max_amount = max(self.max_amount, self[player.ID].amount)
 
     def total_raise(self):
-        total = 0
-        for ID in self:
-            total += self[ID].amount
-        return total
+        return self.total
 
     def max_raise(self):
-        return max((self[ID].amount for ID in self)) if len(self) > 0 else 0
+        return self.max_amount
 
 
-def deal_hands(deck, num_players: int) -> List[List[Card]]:
+def deal_hands(deck, num_players: int) -> List[List[int]]:
     hands = [[] for _ in range(num_players)]
 
     for i in range(2):
@@ -64,8 +82,8 @@ def deal_hands(deck, num_players: int) -> List[List[Card]]:
     return hands
 
 
-def deal_comm_cards(deck: List[Card], discard: List[Card]) -> List[Card]:
-    comm_cards: List[Card] = []
+def deal_comm_cards(deck: List[int], discard: List[int]) -> List[int]:
+    comm_cards: List[int] = []
     deal_order = [discard, comm_cards, comm_cards, comm_cards, discard, comm_cards, discard, comm_cards]
     for pile in deal_order:
         pile.append(deck.pop())
@@ -109,13 +127,15 @@ def get_winners(scores: List[Tuple[Player, int]]):
 
 class Hand:
 
-    def __init__(self, players: List[Player], deck: List[Card], start_pos: int, round_num: int, verbose=True):
+    def __init__(self, players: List[Player], deck: List[int], start_pos: int, round_num: int, verbose=True,
+                 recorder: Optional[HandHistoryWriter] = None, limits: Optional[ActionLimits] = None,
+                 metrics: Optional[DealerMetrics] = None):
 
         self.verbose = verbose
         self.deck = deck
         self.all_players = players
 
-        self.discard: List[Card] = []
+        self.discard: List[int] = []
         self.hands = deal_hands(self.deck, len(players))
         self.all_hand_players = [HandPlayer(p, h) for p, h in zip(players, self.hands)]
         self.face_down_community_cards = deal_comm_cards(self.deck, self.discard)
@@ -126,6 +146,15 @@ class Hand:
         self.top_pot: Pot = Pot(0, 0, list(self.all_hand_players))
         self.pots: List[Pot] = [self.top_pot]
 
+        self.limits = limits
+        self.metrics = metrics
+        self.recorder = recorder
+        self.record: Optional[HandRecord] = None
+        if recorder is not None:
+            self.record = HandRecord({p.ID: seat for seat, p in enumerate(self.all_hand_players)})
+            self.start_holdings = [p.holdings for p in self.all_hand_players]
+        self.winnings = {}
+
         self.print("Hand initiated:", str(self))
 
     def print(self, *kargs):
@@ -140,7 +169,10 @@ class Hand:
 
     def run(self):
 
-        self.notify_players("---- New Hand :: Round {} ----".format(self.round_num))
+        self.record_start_pos = self.start_pos
+        self.print("Sending to all new hand", self.round_num)
+        for player in self.all_hand_players:
+            player.coms.send_new_hand(self.round_num)
         self.notify_player_statuses()
         self.deal_hands()
 
@@ -153,29 +185,32 @@ class Hand:
         self.run_bet_round()
         self.decide_winner()
 
+        if self.recorder is not None:
+            self.write_record()
+
+        for player in self.all_hand_players:
+            player.coms.flush()
+
         self.put_cards_back_in_deck()
         self.update_player_holdings()
 
+    def write_record(self):
+        seats = [(seat, p.ID, p.hand[0], p.hand[1], p.folded, start_holdings, p.bet_amount, self.winnings[p.ID])
+                 for seat, (p, start_holdings) in enumerate(zip(self.all_hand_players, self.start_holdings))]
+        self.recorder.write_hand(self.round_num, self.record_start_pos, self.face_up_community_cards, seats,
+                                 self.record.actions, self.record.pots)
+
     def update_player_holdings(self):
         for player, hand_player in zip(self.all_players, self.all_hand_players):
             player.holdings = hand_player.holdings
-
-    def notify_players(self, s, exclude=None):
-        self.print("Sending to all {}".format(s))
-        for player in self.all_hand_players:
-            if exclude is None \
-                    or type(exclude) == int and player.ID is not exclude \
-                    or type(exclude) == list and player.ID not in exclude:
-                player.coms.send_line(s, verbose=False)
+            player.time_bank = hand_player.time_bank
 
     def notify_player_statuses(self):
-
-        self.notify_players("The following players are still in: " + ", ".join([p.name for p in self.all_hand_players]))
-        self.notify_players("Money left")
-
+        names = [p.name for p in self.all_hand_players]
+        holdings = [(p.name, p.holdings) for p in self.all_hand_players]
         for player in self.all_hand_players:
-            player.coms.send_line("You: {}".format(player.holdings), verbose=False)
-            self.notify_players("{}: {}".format(player.name, player.holdings), exclude=player.ID)
+            player.coms.send_players_in(names)
+            player.coms.send_money(holdings)
 
     def get_blinds(self, small_blind=5, big_blind=10) -> List[Bet]:
         if self.start_pos > len(self.top_pot.playing_players):
@@ -186,23 +221,25 @@ class Hand:
 
         small_blind_enable = len(self.top_pot.playing_players) > 2
 
-        self.notify_players("Big blind is {}".format(big_blind))
-        self.notify_players("Small blind is {}".format(small_blind if small_blind_enable else 0))
+        for player in self.all_hand_players:
+            player.coms.send_blinds(big_blind, small_blind if small_blind_enable else 0)
 
         bets = []
         for i, player in enumerate(self.top_pot.playing_players):
             if i == (self.start_pos - 1) % len(self.top_pot.playing_players):
                 blind = min(big_blind, player.holdings)
                 player.bet(blind)
-                player.coms.send_line("You are big blind")
+                player.coms.send_your_blind(bp.BIG_BLIND)
                 bets.append(Bet(blind, player))
+                self.record_action(player, BLIND, blind)
             elif small_blind_enable and i == (self.start_pos - 2) % len(self.top_pot.playing_players):
                 blind = min(small_blind, player.holdings)
                 player.bet(blind)
-                player.coms.send_line("You are small blind")
+                player.coms.send_your_blind(bp.SMALL_BLIND)
                 bets.append(Bet(blind, player))
+                self.record_action(player, BLIND, blind)
             else:
-                player.coms.send_line("You are not the blind", verbose=False)
+                player.coms.send_your_blind(bp.NOT_BLIND)
 
         return bets
 
@@ -234,21 +271,26 @@ class Hand:
 
         if blinds:
             for bet in self.get_blinds():
-                bets[bet.who.ID] = bet
+                bets.add(bet.who, bet.amount)
+
+        # players who can still act; only the current player's action can change this, so it is kept as a count
+        num_active = len([p for p in self.top_pot.playing_players if not p.folded and p.has_money()])
 
         current_index: int = self.start_pos
         round_end_index = self.prev(current_index)
-        while len([p for p in self.top_pot.playing_players if not p.folded and p.has_money()]) > 1:
+        while num_active > 1:
             current_player = self.top_pot.playing_players[current_index]
             if current_player.folded:
-                current_player.coms.send_line("You have folded so cannot bet")
+                current_player.coms.send_cannot_bet(bp.FOLDED)
             elif not current_player.has_money():
-                current_player.coms.send_line("You have no more money so cannot bet")
+                current_player.coms.send_cannot_bet(bp.ALL_IN)
             else:
                 available_options = get_players_options(current_player, self.top_pot.bet + bets.max_raise(), has_bet)
-                current_player.coms.send_line(self.get_player_status(bets, current_player))
+                self.send_player_status(bets, current_player)
 
                 reset_round_end_index = self.get_and_run_player_action(available_options, bets, current_player)
+                if current_player.folded or not current_player.has_money():
+                    num_active -= 1
 
                 if reset_round_end_index:
                     round_end_index = self.prev(current_index)
@@ -261,68 +303,113 @@ class Hand:
 
         self.start_pos = self.mod(self.start_pos)
 
-    def get_player_status(self, bets, current_player):
-        current_pot = self.top_pot.amount + bets.total_raise()
-        current_pot_bet = self.top_pot.bet + bets.max_raise()
-        current_player_bet = current_player.bet_amount
-        current_player_holdings = current_player.holdings
-        status = "Current pot: {}\nCurrent pot bet: {}\nYour current bet: {}\nYour holdings: {}" \
-            .format(current_pot, current_pot_bet, current_player_bet, current_player_holdings)
-        return status
+    def send_player_status(self, bets, current_player):
+        current_player.coms.send_status(self.top_pot.amount + bets.total_raise(), self.top_pot.bet + bets.max_raise(),
+                                        current_player.bet_amount, current_player.holdings)
 
     def add_bets_to_pots(self, bets: Bets):
-        max_raise = bets.max_raise()
-        if all([bets[ID].amount == max_raise for ID in bets]):
-            self.top_pot.bet += max_raise
+        sorted_bets = sorted(bets.values(), key=lambda x: x.amount)
+        if len(sorted_bets) == 0 or sorted_bets[0].amount == sorted_bets[-1].amount:
+            self.top_pot.bet += bets.max_raise()
             self.top_pot.amount += bets.total_raise()
             self.top_pot.playing_players = [p for p in self.top_pot.playing_players if not p.folded]
         else:
-            bets = list(bets.values())
-            bets.sort(key=lambda x: x.amount)
+            # one side pot per distinct bet level, each shared by everyone who bet at least that much
             current_pot = self.pots.pop()
             base_pot_amount = current_pot.amount
             prev_pot_bet = current_pot.bet
-            while len(bets) > 0:
-                bet = bets[0]
-                bet_amount = bet.amount
-                new_bet = bet_amount + prev_pot_bet
-                new_pot = base_pot_amount + bet_amount * len(bets)
-                pot_players = [bet.who for bet in bets if not bet.who.folded]
+            prev_level = 0
+            for i, bet in enumerate(sorted_bets):
+                if i > 0 and bet.amount == prev_level:
+                    continue
+                step = bet.amount - prev_level
+                new_bet = prev_pot_bet + step
+                new_pot = base_pot_amount + step * (len(sorted_bets) - i)
+                pot_players = [b.who for b in sorted_bets[i:] if not b.who.folded]
                 self.pots.append(Pot(new_pot, new_bet, pot_players))
-                for b in bets:
-                    b.amount -= bet_amount
-                bets = [bet for bet in bets if bet.amount > 0]
+                prev_level = bet.amount
                 prev_pot_bet = new_bet
                 base_pot_amount = 0
             self.top_pot = self.pots[-1]
 
     def get_and_run_player_action(self, available_options: List[str], bets: Bets, current_player: HandPlayer) -> bool:
+        bet_before = current_player.bet_amount
+        started = time.monotonic()
+        attempts = 0
         while True:
-            current_player.coms.send_line("/".join(available_options))
-            action = current_player.coms.recv(20)
+            current_player.coms.send_options(available_options)
+            timeout = None if self.limits is None else self.limits.time_left(current_player, started)
+            if self.metrics is not None:
+                asked = time.perf_counter()
+            try:
+                action = current_player.coms.recv_action(timeout=timeout)
+            except TimeoutError:
+                if self.metrics is not None:
+                    # the time it was given is a lower bound on how long this player takes to decide
+                    self.metrics.decision(current_player.name, STREETS[len(self.face_up_community_cards)],
+                                          time.perf_counter() - asked)
+                action, reset_round_end_index = self.run_auto_action(bets, current_player, "timed out")
+                break
+            if self.metrics is not None:
+                self.metrics.decision(current_player.name, STREETS[len(self.face_up_community_cards)],
+                                      time.perf_counter() - asked)
 
             try:
-                display, reset_round_end_index = self.run_player_action(available_options, bets, current_player, action)
-                current_player.coms.send_line("SUCCESS")
+                reset_round_end_index = self.run_player_action(available_options, bets, current_player, action)
+                current_player.coms.send_success()
                 break
             except Exception as e:
-                current_player.coms.send_line("ERROR: {}".format(e))
-
-        self.notify_players("Opponent action: {} {}".format(current_player.name, display), exclude=current_player.ID)
+                current_player.coms.send_error(str(e))
+                if self.metrics is not None:
+                    self.metrics.invalid_action(current_player.name, STREETS[len(self.face_up_community_cards)])
+                attempts += 1
+                if self.limits is not None and self.limits.retries_exhausted(attempts):
+                    action, reset_round_end_index = self.run_auto_action(bets, current_player,
+                                                                         "too many invalid actions")
+                    break
+
+        if self.limits is not None:
+            self.limits.charge(current_player, started)
+        self.record_action(current_player, ACTION_CODES[action.split(" ")[0]], current_player.bet_amount - bet_before)
+
+        action_name = action.split(" ")[0]
+        if self.metrics is not None:
+            self.metrics.action(current_player.name, STREETS[len(self.face_up_community_cards)], action_name)
+        raise_amount = get_raise_amount(action) if action_name == "Raise" else 0
+        for player in self.all_hand_players:
+            if player.ID != current_player.ID:
+                player.coms.send_opponent_action(current_player.name, action_name, raise_amount,
+                                                 current_player.bet_amount)
         return reset_round_end_index
 
+    def run_auto_action(self, bets: Bets, current_player: HandPlayer, reason: str) -> Tuple[str, bool]:
+        # check when there is nothing to call, otherwise fold
+        to_call = self.top_pot.bet + bets.max_raise() - current_player.bet_amount
+        action = "Call" if to_call == 0 else "Fold"
+        reset_round_end_index = self.run_player_action([action], bets, current_player, action)
+        current_player.coms.send_auto_action(action, reason)
+        if self.metrics is not None:
+            self.metrics.auto_action(current_player.name, reason)
+        self.print("{} {}, auto action {}".format(current_player.name, reason, action))
+        return action, reset_round_end_index
+
+    def record_action(self, player: HandPlayer, action: int, amount: int):
+        if self.record is not None:
+            self.record.action(STREETS[len(self.face_up_community_cards)], player.ID, action, amount,
+                               player.bet_amount)
+
     def run_player_action(self, available_options: List[str], bets: Bets, current_player: HandPlayer, action: str) \
-            -> Tuple[str, bool]:
+            -> bool:
 
         if action == "Fold":
             current_player.fold()
-            return "Folded", False
+            return False
         elif action == "Call":
             self.call_bet(current_player, bets)
-            return "Called", False
+            return False
         elif "Raise" in available_options and action.startswith("Raise"):
-            display = self.raise_bet(current_player, action, bets)
-            return display, True
+            self.raise_bet(current_player, action, bets)
+            return True
         elif action == "Money":
             current_player.holdings += 100
             raise Exception("Money added")
@@ -333,10 +420,7 @@ class Hand:
         current_max_bet = self.top_pot.bet + bets.max_raise()
         diff = min(current_max_bet - current_player.bet_amount, current_player.holdings)
         current_player.bet(diff)
-        if current_player.ID in bets:
-            bets[current_player.ID].amount += diff
-        else:
-            bets[current_player.ID] = Bet(diff, current_player)
+        bets.add(current_player, diff)
 
     def raise_bet(self, current_player, action, bets):
         raise_amount = get_raise_amount(action)
@@ -345,63 +429,57 @@ class Hand:
         if current_player.holdings < diff:
             raise Exception("not enough money to raise by " + str(raise_amount))
         current_player.bet(diff)
-        if current_player.ID in bets:
-            bets[current_player.ID].amount += diff
-        else:
-            bets[current_player.ID] = Bet(diff, current_player)
-        return "Raised by {} to {}".format(raise_amount, current_player.bet_amount)
+        bets.add(current_player, diff)
 
     def reveal_cards(self, num):
         cards = self.face_down_community_cards[:num]
         for player in self.top_pot.playing_players:
             player.coms.send_card_reveal(cards)
 
+        for player in self.all_hand_players:
+            for card in cards:
+                player.evaluator.push(card)
+
         self.face_down_community_cards = self.face_down_community_cards[num:]
         self.face_up_community_cards = self.face_up_community_cards + cards
         self.print("revealed cards:", cards)
 
     def decide_winner(self):
 
-        def score_player_hand(player: HandPlayer) -> Tuple[HandPlayer, Score]:
-            return player, get_hand_max(player.hand + self.face_up_community_cards)
-
-        scores: List[Tuple[HandPlayer, Score]] = [score_player_hand(player) for player in self.all_hand_players \
-                                                  if not player.folded]
-        scores.sort(key=lambda x: x[1].value, reverse=True)
+        scores: List[Tuple[HandPlayer, int]] = [(player, player.evaluator.best) for player in self.all_hand_players
+                                                if not player.folded]
+        scores.sort(key=lambda x: x[1], reverse=True)
 
         self.print("SCORES:", scores)
-        self.notify_players("Results [{}]".format(len(scores)))
-
-        for score in scores:
-            player = score[0]
-            trick_name = score[1].trick_name
-            self.notify_players("{} got {}".format(player.name, trick_name), exclude=player.ID)
 
-        for score in scores:
-            player = score[0]
-            trick_name = score[1].trick_name
-            player.coms.send_line("You got {}".format(trick_name), verbose=False)
+        results = [(player.name, score, describe_hand(score, player.hand + self.face_up_community_cards))
+                   for player, score in scores]
 
-        self.notify_players("Pots [{}]".format(len(self.pots)))
         winnings = {player.ID: 0 for player in self.all_hand_players}
+        pot_results = []
         self.print("POTS:", self.pots)
         for pot in self.pots:
             pot_amount = pot.amount
             player_ids = [p.ID for p in pot.playing_players]
-            pot_scores = [(p[0], p[1].value) for p in scores if p[0].ID in player_ids]
+            pot_scores = [p for p in scores if p[0].ID in player_ids]
             winners = get_winners(pot_scores)
             share = int(pot_amount / len(winners))
-            self.notify_players("{} win {} bet pot worth {} giving {} each"
-                                .format(", ".join((w.name for w in winners)), pot.bet, pot.amount, share))
+            pot_results.append(([w.name for w in winners], pot.bet, pot.amount, share))
             for winner in winners:
                 winnings[winner.ID] += share
+            if self.record is not None:
+                self.record.pot(pot.amount, pot.bet, player_ids, [w.ID for w in winners], share)
 
-        self.notify_players("Winnings")
         for player in self.all_hand_players:
-            amount = winnings[player.ID]
-            player.win(amount)
-            player.coms.send_line("In total you won {}".format(amount), verbose=False)
-            self.notify_players("In total {} won {}".format(player.name, amount), exclude=player.ID)
+            player.coms.send_results(results)
+            player.coms.send_pots(pot_results)
+
+        self.winnings = winnings
+        for player in self.all_hand_players:
+            player.win(winnings[player.ID])
+        winnings_list = [(p.name, winnings[p.ID]) for p in self.all_hand_players]
+        for player in self.all_hand_players:
+            player.coms.send_winnings(winnings_list)
 
     def __repr__(self):
         return "players={}, hands={}, face_up_community_card={}, face_down_community_cards={}, pot={}" \
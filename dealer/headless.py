@@ -0,0 +1,34 @@
+from typing import List, Optional
+
+from .communicator import Communicator, BinaryCommunicator
+from .game import Game
+from .history import HandHistoryWriter
+from .metrics import DealerMetrics
+from .player import Player
+from .transport import DirectTransport
+
+
+def seat_bots(bots: List, verbose=False, binary=False) -> List[Player]:
+    names = [bot.player_name for bot in bots]
+    if len(set(names)) != len(names):
+        raise Exception("bots need unique names: {}".format(names))
+
+    players = []
+    for i, bot in enumerate(bots):
+        communicator = BinaryCommunicator if binary else Communicator
+        coms = communicator(DirectTransport(bot), verbose=verbose)
+        coms.name = bot.player_name
+        players.append(Player(i, bot.player_name, coms))
+    return players
+
+
+def run_headless_game(bots: List, verbose=False, max_hands: Optional[int] = None, seed: Optional[int] = None,
+                      recorder: Optional[HandHistoryWriter] = None, binary=False,
+                      metrics: Optional[DealerMetrics] = None) -> Game:
+    game = Game(seat_bots(bots, verbose=verbose, binary=binary), verbose=verbose, seed=seed, recorder=recorder,
+                metrics=metrics)
+    while not game.finished() and (max_hands is None or game.round_num <= max_hands):
+        game.run_hand()
+    if game.finished():
+        game.congratulate_winner()
+    return game
@@ -0,0 +1,96 @@
+import os
+import struct
+from os.path import join
+from typing import List, Tuple, Dict
+
+# Each table is an append-only file of fixed-width little-endian records, linked by hand_id.
+# The field lists are shared with history_reader so the numpy dtypes always match the struct layouts.
+HAND_FIELDS = [("hand_id", "Q"), ("round_num", "I"), ("num_seats", "B"), ("start_pos", "B"),
+               ("board0", "B"), ("board1", "B"), ("board2", "B"), ("board3", "B"), ("board4", "B"),
+               ("num_actions", "H"), ("num_pots", "B")]
+SEAT_FIELDS = [("hand_id", "Q"), ("seat", "B"), ("player_id", "B"), ("card0", "B"), ("card1", "B"), ("folded", "B"),
+               ("start_holdings", "i"), ("bet", "i"), ("winnings", "i")]
+ACTION_FIELDS = [("hand_id", "Q"), ("sequence", "H"), ("street", "B"), ("seat", "B"), ("action", "B"),
+                 ("amount", "i"), ("bet", "i")]
+POT_FIELDS = [("hand_id", "Q"), ("pot", "B"), ("amount", "i"), ("bet", "i"), ("players", "I"), ("winners", "I"),
+              ("share", "i")]
+
+TABLES = {"hands": HAND_FIELDS, "seats": SEAT_FIELDS, "actions": ACTION_FIELDS, "pots": POT_FIELDS}
+DETAIL_TABLES = ["seats", "actions", "pots"]
+
+NO_CARD = 255
+
+BLIND = 0
+FOLD = 1
+CALL = 2
+RAISE = 3
+ACTION_CODES = {"Fold": FOLD, "Call": CALL, "Raise": RAISE}
+
+STREETS = {0: 0, 3: 1, 4: 2, 5: 3}
+
+
+def record_struct(fields: List[Tuple[str, str]]) -> struct.Struct:
+    return struct.Struct("<" + "".join(code for _, code in fields))
+
+
+def table_path(directory: str, table: str) -> str:
+    return join(directory, table + ".bin")
+
+
+def players_mask(seats: List[int]) -> int:
+    mask = 0
+    for seat in seats:
+        mask |= 1 << seat
+    return mask
+
+
+class HandHistoryWriter:
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.structs = {table: record_struct(fields) for table, fields in TABLES.items()}
+        self.files = {table: open(table_path(directory, table), "ab") for table in TABLES}
+        self.next_hand_id = self.files["hands"].tell() // self.structs["hands"].size
+
+    def write_hand(self, round_num: int, start_pos: int, board: List[int], seats: List[Tuple], actions: List[Tuple],
+                   pots: List[Tuple]) -> int:
+        hand_id = self.next_hand_id
+        self.next_hand_id += 1
+
+        # Each hand is flushed as soon as it is written, its hands row last, so a reader of a running game that maps
+        # hands.bin before the other tables, as HandHistory does, finds every row the hands it sees refer to.
+        board = list(board) + [NO_CARD] * (5 - len(board))
+        self.write("seats", [(hand_id, *seat) for seat in seats])
+        self.write("actions", [(hand_id, sequence, *action) for sequence, action in enumerate(actions)])
+        self.write("pots", [(hand_id, index, *pot) for index, pot in enumerate(pots)])
+        self.write("hands", [(hand_id, round_num, len(seats), start_pos, *board, len(actions), len(pots))])
+        self.flush()
+        return hand_id
+
+    def write(self, table: str, records: List[Tuple]):
+        pack = self.structs[table].pack
+        self.files[table].write(b"".join(pack(*record) for record in records))
+
+    def flush(self):
+        for table in DETAIL_TABLES + ["hands"]:
+            self.files[table].flush()
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+
+
+class HandRecord:
+    """Collects what happens in one Hand so it can be written as a single set of records."""
+
+    def __init__(self, seat_of: Dict[int, int]):
+        self.seat_of = seat_of
+        self.actions: List[Tuple] = []
+        self.pots: List[Tuple] = []
+
+    def action(self, street: int, player_id: int, action: int, amount: int, bet: int):
+        self.actions.append((street, self.seat_of[player_id], action, amount, bet))
+
+    def pot(self, amount: int, bet: int, player_ids: List[int], winner_ids: List[int], share: int):
+        self.pots.append((amount, bet, players_mask([self.seat_of[ID] for ID in player_ids]),
+                          players_mask([self.seat_of[ID] for ID in winner_ids]), share))
@@ -0,0 +1,51 @@
+import mmap
+from os.path import getsize
+from typing import List, Tuple, Dict
+
+import numpy as np
+
+from .history import TABLES, table_path
+
+NUMPY_CODES = {"Q": "<u8", "I": "<u4", "i": "<i4", "H": "<u2", "B": "u1"}
+
+
+def record_dtype(fields: List[Tuple[str, str]]) -> np.dtype:
+    return np.dtype([(name, NUMPY_CODES[code]) for name, code in fields])
+
+
+class HandHistory:
+    """Read-only columnar view over a hand history directory, backed by memory maps rather than copies."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._maps: Dict[str, mmap.mmap] = {}
+        self.tables: Dict[str, np.ndarray] = {table: self.map_table(table, fields) for table, fields in TABLES.items()}
+
+    def map_table(self, table: str, fields: List[Tuple[str, str]]) -> np.ndarray:
+        dtype = record_dtype(fields)
+        path = table_path(self.directory, table)
+        num_records = getsize(path) // dtype.itemsize
+        if num_records == 0:
+            return np.zeros(0, dtype=dtype)
+        with open(path, "rb") as f:
+            self._maps[table] = mmap.mmap(f.fileno(), num_records * dtype.itemsize, access=mmap.ACCESS_READ)
+        return np.frombuffer(self._maps[table], dtype=dtype, count=num_records)
+
+    @property
+    def hands(self) -> np.ndarray:
+        return self.tables["hands"]
+
+    @property
+    def seats(self) -> np.ndarray:
+        return self.tables["seats"]
+
+    @property
+    def actions(self) -> np.ndarray:
+        return self.tables["actions"]
+
+    @property
+    def pots(self) -> np.ndarray:
+        return self.tables["pots"]
+
+    def __len__(self):
+        return len(self.hands)
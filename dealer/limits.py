@@ -0,0 +1,31 @@
+import time
+from typing import Optional
+
+from .player import Player
+
+
+class ActionLimits:
+    """How long and how many attempts a player gets to act before the dealer acts for them.
+
+    Each action may take action_time seconds. Time beyond that is taken from the player's time bank, which starts
+    at time_bank seconds per game and is never refilled. With action_time None there is no deadline, and with
+    max_retries None invalid actions are re-asked for forever.
+    """
+
+    def __init__(self, action_time: Optional[float] = None, time_bank: float = 0.0, max_retries: Optional[int] = None):
+        self.action_time = action_time
+        self.time_bank = time_bank
+        self.max_retries = max_retries
+
+    def time_left(self, player: Player, started: float) -> Optional[float]:
+        if self.action_time is None:
+            return None
+        return max(0.0, started + self.action_time + player.time_bank - time.monotonic())
+
+    def charge(self, player: Player, started: float):
+        if self.action_time is not None:
+            overrun = time.monotonic() - started - self.action_time
+            player.time_bank = max(0.0, player.time_bank - max(0.0, overrun))
+
+    def retries_exhausted(self, attempts: int) -> bool:
+        return self.max_retries is not None and attempts > self.max_retries
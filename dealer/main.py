@@ -1,50 +1,66 @@
  
 import socket
+from typing import Iterable, List, Optional, Tuple
 
 from .game import Game
+from .match import run_match
 from .player import Player
-from .communicator import Communicator
+from .communicator import Communicator, BinaryCommunicator, parse_join
+from .transport import SocketTransport
+from .endpoints import listen, endpoint_of, close_listener
 
 
-def run_game_for_n_players(num_players, verbose=True):
-    players = run_lobby(num_players, verbose=verbose)
+def run_game_for_n_players(num_players, verbose=True, endpoint: Optional[str] = None):
+    players = run_lobby(num_players, verbose=verbose, endpoint=endpoint)
     if verbose:
         print("players:", players)
     run_game(players, verbose=verbose)
 
 
-def run_lobby(num_players: int, verbose=True):
+def run_match_for_n_players(num_players, num_games, verbose=True, endpoint: Optional[str] = None):
+    players = run_lobby(num_players, verbose=verbose, endpoint=endpoint)
+    if verbose:
+        print("players:", players)
+    winners = run_match(players, num_games, verbose=verbose)
+    print("games won:", {player.name: winners.count(player.ID) for player in players})
 
-    ip_address = get_local_ip()
-    port = 8080
 
-    s = socket.socket()
-    s.bind((ip_address, port))
-    s.listen()
+def run_lobby(num_players: int, verbose=True, endpoint: Optional[str] = None):
+
+    s = listen(endpoint)
+    # always printed, as with port 0 or a temporary path this is the only way to find out where to connect
+    print("dealer is listening at {}".format(endpoint_of(s)))
+
+    players = seat_connections(iter(lambda: s.accept()[0], None), num_players, verbose=verbose)
+    close_listener(s)
+    return players
 
-    if verbose:
-        print("dealer is listening at {} on port {}".format(ip_address, port))
 
+def seat_connections(conns: Iterable[socket.socket], num_players: int, verbose=True) -> List[Player]:
+    """Runs the lobby handshake on each connection in turn, which may be accepted ones or socketpair ends, until
+    num_players have joined. A connection that closes without giving a name is skipped."""
     players = []
     names = []
-    for i in range(num_players):
-        conn, _ = s.accept()
-        coms = Communicator(conn, verbose=verbose)
-        coms.send("Welcome to the poker lobby. You are player {} of {}. Please enter name: ".format(i+1, num_players))
-        while True:
-            name: str = coms.recv(20)
-            if name in names:
-                coms.send("Someone else has that name. Please enter a different name: ")
-            elif ',' in name or " " in name:
-                coms.send("Name cannot contain the ',' character. Please enter a different name: ")
-            else:
-                names.append(name)
-                break
-        coms.send("Hi %s, please wait to be dealt your hand\n"%(name))
+    for conn in conns:
+        coms = Communicator(SocketTransport(conn), verbose=verbose)
+        try:
+            name, binary = ask_name(coms, names, len(players) + 1, num_players)
+        except OSError:
+            name = ""
+        if name == "":
+            coms.transport.close()
+            continue
+        names.append(name)
+        if binary:
+            coms = BinaryCommunicator(coms.transport, verbose=verbose)
+        coms.send_welcome(name)
+        coms.flush()
         if verbose:
             print(name, "has joined the game")
         coms.name = name
-        players.append(Player(i, name, coms))
+        players.append(Player(len(players), name, coms))
+        if len(players) == num_players:
+            break
 
     if verbose:
         print("all players have joined")
@@ -52,17 +68,22 @@ def run_lobby(num_players: int, verbose=True):
     return players
 
 
-def get_local_ip() -> str:
-    address_list = socket.gethostbyname_ex(socket.gethostname())[2]
-    ip_addresses = [a for a in address_list if a.startswith("192.168.1.")]
-    if len(ip_addresses) < 1:
-        raise Exception("Could not find an address that looks like a local ip")
-    return ip_addresses[0]
+def ask_name(coms: Communicator, names: List[str], position: int, num_players: int) -> Tuple[str, bool]:
+    """Returns the name the player gave and whether they asked for the binary protocol, or "" if they left."""
+    coms.send("Welcome to the poker lobby. You are player {} of {}. Please enter name: ".format(position, num_players))
+    while True:
+        name, binary = parse_join(coms.recv(40))
+        if name in names:
+            coms.send("Someone else has that name. Please enter a different name: ")
+        elif ',' in name or " " in name:
+            coms.send("Name cannot contain the ',' character. Please enter a different name: ")
+        else:
+            return name, binary
 
 
-def run_game(players, verbose=True):
+def run_game(players, verbose=True, seed=None, limits=None, metrics=None):
 
-    game = Game(players, verbose=verbose)
+    game = Game(players, verbose=verbose, seed=seed, limits=limits, metrics=metrics)
     while not game.finished():
         game.run_hand()
     game.congratulate_winner()
@@ -0,0 +1,59 @@
+import random
+from typing import List, Optional
+
+from .game import Game
+from .history import HandHistoryWriter
+from .limits import ActionLimits
+from .metrics import DealerMetrics
+from .player import Player
+
+
+class Match:
+    """Plays consecutive games at one table over the same connections.
+
+    Each game starts with a new game message, which tells the players to forget the last one, and everyone starts
+    it with the money they joined with. Players who go out or win stay connected until close, which says Goodbye.
+    """
+
+    def __init__(self, players: List[Player], verbose=True, recorder: Optional[HandHistoryWriter] = None,
+                 limits: Optional[ActionLimits] = None, metrics: Optional[DealerMetrics] = None):
+        self.players = players
+        self.verbose = verbose
+        self.recorder = recorder
+        self.limits = limits
+        self.metrics = metrics
+        self.starting_holdings = [player.holdings for player in players]
+        self.game_num = 0
+
+    def play_game(self, seed: Optional[int] = None, max_hands: Optional[int] = None) -> Optional[Player]:
+        """Returns the winner, or None if there is not one after max_hands hands."""
+        self.game_num += 1
+        for player, holdings in zip(self.players, self.starting_holdings):
+            player.holdings = holdings
+            player.coms.send_new_game(self.game_num)
+
+        game = Game(self.players, verbose=self.verbose, seed=seed, recorder=self.recorder, limits=self.limits,
+                    close_players=False, metrics=self.metrics)
+        while not game.finished() and (max_hands is None or game.round_num <= max_hands):
+            game.run_hand()
+        if not game.finished():
+            return None
+        game.congratulate_winner()
+        return game.players_still_in[0]
+
+    def close(self):
+        for player in self.players:
+            player.coms.close()
+
+
+def run_match(players: List[Player], num_games: int, verbose=True, seed: Optional[int] = None,
+              limits: Optional[ActionLimits] = None, metrics: Optional[DealerMetrics] = None) -> List[int]:
+    """Plays num_games games and returns the ID of each one's winner."""
+    rng = random.Random(seed)
+    match = Match(players, verbose=verbose, limits=limits, metrics=metrics)
+    winners = []
+    for _ in range(num_games):
+        winner = match.play_game(seed=rng.getrandbits(32))
+        winners.append(winner.ID)
+    match.close()
+    return winners
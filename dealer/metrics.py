@@ -0,0 +1,197 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+# upper bounds in seconds, from in-process bots answering in microseconds to people thinking it over
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+           30.0)
+STREET_NAMES = ("preflop", "flop", "turn", "river")
+
+
+class Histogram:
+
+    def __init__(self, bounds: Tuple[float, ...] = BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # the last one counts everything above the largest bound
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[int]:
+        total = 0
+        cumulative = []
+        for count in self.counts:
+            total += count
+            cumulative.append(total)
+        return cumulative
+
+    def quantile(self, q: float) -> Optional[float]:
+        """The upper bound of the bucket the q quantile falls in, or None before anything has been observed."""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        for bound, total in zip(self.bounds + (float("inf"),), self.cumulative()):
+            if total >= rank:
+                return bound
+        return float("inf")
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": {format_bound(bound): total
+                        for bound, total in zip(self.bounds + (float("inf"),), self.cumulative())},
+        }
+
+
+def format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def format_labels(names: Tuple[str, ...], values: Tuple) -> str:
+    return ",".join("{}=\"{}\"".format(name, escape_label(str(value))) for name, value in zip(names, values))
+
+
+class DealerMetrics:
+    """Counters and latency histograms for the tables that are given it, as limits and recorder are.
+
+    Decisions are timed from sending a player their options to their reply, or to the deadline if it never came,
+    and are kept per player and street. snapshot() returns everything as a dict, and with a path it is written
+    there at most every interval seconds: as JSON for a .json path, otherwise in the Prometheus text format. Tables
+    on different threads can share one.
+    """
+
+    def __init__(self, path: Optional[str] = None, interval: float = 10.0):
+        self.path = path
+        self.interval = interval
+        self.started = time.monotonic()
+        self.next_write = self.started + interval
+        self.lock = threading.Lock()
+        self.hands = 0
+        self.hand_seconds = Histogram()
+        self.decision_seconds: Dict[Tuple[str, str], Histogram] = {}
+        self.actions: Dict[Tuple[str, str, str], int] = {}
+        self.invalid_actions: Dict[Tuple[str, str], int] = {}
+        self.auto_actions: Dict[Tuple[str, str], int] = {}
+
+    def decision(self, player: str, street: int, seconds: float):
+        with self.lock:
+            key = (player, STREET_NAMES[street])
+            histogram = self.decision_seconds.get(key)
+            if histogram is None:
+                histogram = self.decision_seconds[key] = Histogram()
+            histogram.observe(seconds)
+
+    def action(self, player: str, street: int, action: str):
+        key = (player, STREET_NAMES[street], action)
+        with self.lock:
+            self.actions[key] = self.actions.get(key, 0) + 1
+
+    def invalid_action(self, player: str, street: int):
+        key = (player, STREET_NAMES[street])
+        with self.lock:
+            self.invalid_actions[key] = self.invalid_actions.get(key, 0) + 1
+
+    def auto_action(self, player: str, reason: str):
+        key = (player, reason)
+        with self.lock:
+            self.auto_actions[key] = self.auto_actions.get(key, 0) + 1
+
+    def hand_finished(self, seconds: float):
+        with self.lock:
+            self.hands += 1
+            self.hand_seconds.observe(seconds)
+            # decided under the lock so that only one of the tables sharing this writes each time
+            due = self.path is not None and time.monotonic() >= self.next_write
+            if due:
+                self.next_write = time.monotonic() + self.interval
+        if due:
+            self.write()
+
+    def hands_per_second(self) -> float:
+        return self.hands / max(time.monotonic() - self.started, 1e-9)
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            return {
+                "uptime_seconds": time.monotonic() - self.started,
+                "hands": self.hands,
+                "hands_per_second": self.hands_per_second(),
+                "hand_seconds": self.hand_seconds.to_dict(),
+                "decision_seconds": [dict(player=player, street=street, **histogram.to_dict())
+                                     for (player, street), histogram in self.decision_seconds.items()],
+                "actions": [{"player": player, "street": street, "action": action, "count": count}
+                            for (player, street, action), count in self.actions.items()],
+                "invalid_actions": [{"player": player, "street": street, "count": count}
+                                    for (player, street), count in self.invalid_actions.items()],
+                "auto_actions": [{"player": player, "reason": reason, "count": count}
+                                 for (player, reason), count in self.auto_actions.items()],
+            }
+
+    def to_prometheus(self) -> str:
+        lines = []
+
+        def metric(name: str, kind: str, description: str):
+            lines.append("# HELP {} {}".format(name, description))
+            lines.append("# TYPE {} {}".format(name, kind))
+
+        def counter(name: str, description: str, label_names: Tuple[str, ...], counts: Dict[Tuple, int]):
+            metric(name, "counter", description)
+            for labels, count in counts.items():
+                lines.append("{}{{{}}} {}".format(name, format_labels(label_names, labels), count))
+
+        def histogram(name: str, labels: str, values: Histogram):
+            prefix = labels + "," if labels else ""
+            for bound, total in zip(values.bounds + (float("inf"),), values.cumulative()):
+                lines.append("{}_bucket{{{}le=\"{}\"}} {}".format(name, prefix, format_bound(bound), total))
+            braces = "{" + labels + "}" if labels else ""
+            lines.append("{}_sum{} {}".format(name, braces, values.sum))
+            lines.append("{}_count{} {}".format(name, braces, values.count))
+
+        with self.lock:
+            metric("dealer_uptime_seconds", "gauge", "Seconds since the metrics were created.")
+            lines.append("dealer_uptime_seconds {}".format(time.monotonic() - self.started))
+            metric("dealer_hands_total", "counter", "Hands played.")
+            lines.append("dealer_hands_total {}".format(self.hands))
+            metric("dealer_hands_per_second", "gauge", "Hands played per second since the metrics were created.")
+            lines.append("dealer_hands_per_second {}".format(self.hands_per_second()))
+            metric("dealer_hand_seconds", "histogram", "Time taken to play a hand.")
+            histogram("dealer_hand_seconds", "", self.hand_seconds)
+            metric("dealer_decision_seconds", "histogram", "Time from sending a player their options to their reply.")
+            for labels, values in self.decision_seconds.items():
+                histogram("dealer_decision_seconds", format_labels(("player", "street"), labels), values)
+            counter("dealer_actions_total", "Actions taken by players.", ("player", "street", "action"),
+                    self.actions)
+            counter("dealer_invalid_actions_total", "Actions the dealer rejected.", ("player", "street"),
+                    self.invalid_actions)
+            counter("dealer_auto_actions_total", "Actions the dealer took for a player.", ("player", "reason"),
+                    self.auto_actions)
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Optional[str] = None):
+        """Writes a snapshot to path, or the path given when created, replacing the file in one go so a collector
+        never reads half of one."""
+        if path is None:
+            path = self.path
+        if path.endswith(".json"):
+            text = json.dumps(self.snapshot(), indent=1)
+        else:
+            text = self.to_prometheus()
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as f:
+            f.write(text)
+        os.replace(temp_path, path)
@@ -8,6 +8,7 @@ class Player:
         self.name = name
         self.coms = coms
         self.holdings = holdings
+        self.time_bank = 0.0
  
     def has_money(self):
         return self.holdings > 0
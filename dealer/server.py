@@ -0,0 +1,172 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Optional
+
+from .communicator import Communicator, BinaryCommunicator, parse_join
+from .limits import ActionLimits
+from .metrics import DealerMetrics
+from .main import run_game
+from .match import run_match
+from .endpoints import listen, endpoint_of, socket_file, remove_socket_file
+from .player import Player
+
+
+class StreamTransport:
+    """Lets a Game running on a worker thread talk to a client whose connection is owned by the event loop."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, loop: asyncio.AbstractEventLoop):
+        self.reader = reader
+        self.writer = writer
+        self.loop = loop
+
+    def send(self, data: str):
+        self.send_bytes(data.encode("utf8"))
+
+    def send_bytes(self, data: bytes):
+        self.loop.call_soon_threadsafe(self.writer.write, data)
+
+    def recv(self, max_bytes: int, timeout: Optional[float] = None) -> str:
+        return self.recv_bytes(max_bytes, timeout=timeout).decode("utf8")
+
+    def recv_bytes(self, max_bytes: int, timeout: Optional[float] = None) -> bytes:
+        # wait_for cancels the read on timeout, leaving a late reply buffered until discard_pending drops it
+        read = asyncio.wait_for(self.reader.read(max_bytes), timeout)
+        try:
+            return asyncio.run_coroutine_threadsafe(read, self.loop).result()
+        except asyncio.TimeoutError:
+            raise TimeoutError("no reply within {} seconds".format(timeout))
+
+    def discard_pending(self) -> bytes:
+        return asyncio.run_coroutine_threadsafe(self.read_buffered(), self.loop).result()
+
+    async def read_buffered(self) -> bytes:
+        # a read returns as soon as the reader holds data, so one that is not done after a turn of the loop,
+        # which also picks up anything waiting on the socket, would have to wait and is cancelled
+        buffered = bytearray()
+        while True:
+            read = asyncio.ensure_future(self.reader.read(4096))
+            await asyncio.sleep(0)
+            if not read.done():
+                read.cancel()
+                return bytes(buffered)
+            data = read.result()
+            if len(data) == 0:
+                return bytes(buffered)
+            buffered += data
+
+    def connected(self) -> bool:
+        return not (self.reader.at_eof() or self.reader.exception() is not None or self.writer.is_closing())
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.writer.close)
+
+
+class TableServer:
+    """Accepts players concurrently and starts a game every time enough of them have joined to fill a table.
+
+    Connections and lobby conversations are handled on the event loop, so a slow client only delays itself. Each
+    table's Game is the same synchronous code run by run_game, on its own worker thread, so tables never wait
+    on each other. With games_per_table above one each table plays a Match, keeping its players for that many games.
+    """
+
+    def __init__(self, num_players: int, verbose=False, max_tables=1000, limits: Optional[ActionLimits] = None,
+                 games_per_table=1, metrics: Optional[DealerMetrics] = None):
+        self.num_players = num_players
+        self.metrics = metrics
+        self.games_per_table = games_per_table
+        self.limits = limits
+        self.verbose = verbose
+        self.executor = ThreadPoolExecutor(max_workers=max_tables)
+        self.waiting: List[Player] = []
+        self.tables: List[asyncio.Future] = []
+        self.num_tables = 0
+
+    def print(self, *kargs):
+        if self.verbose:
+            print(*kargs)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        loop = asyncio.get_running_loop()
+        writer.write("Welcome to the poker lobby. Tables seat {} players. Please enter name: "
+                     .format(self.num_players).encode("utf8"))
+        while True:
+            reply = (await reader.read(40)).decode("utf8")
+            if reply == "":
+                writer.close()
+                return
+            name, binary = parse_join(reply.strip())
+            self.drop_disconnected()
+            if name in (p.name for p in self.waiting):
+                writer.write(b"Someone else has that name. Please enter a different name: ")
+            elif ',' in name or " " in name:
+                writer.write(b"Name cannot contain the ',' character. Please enter a different name: ")
+            else:
+                break
+        communicator = BinaryCommunicator if binary else Communicator
+        coms = communicator(StreamTransport(reader, writer, loop), verbose=self.verbose)
+        coms.name = name
+        coms.send_welcome(name)
+        coms.flush()
+        self.drop_disconnected()
+        self.waiting.append(Player(len(self.waiting), name, coms))
+        self.print(name, "has joined table", self.num_tables)
+
+        if len(self.waiting) == self.num_players:
+            self.start_table(loop)
+
+    def drop_disconnected(self):
+        """Forgets players who left while waiting for their table to fill, so a dead connection is never seated."""
+        for player in self.waiting:
+            if not player.coms.transport.connected():
+                self.print(player.name, "left before table", self.num_tables, "started")
+                player.coms.transport.writer.close()
+        self.waiting = [player for player in self.waiting if player.coms.transport.connected()]
+        for i, player in enumerate(self.waiting):
+            player.ID = i
+
+    def start_table(self, loop: asyncio.AbstractEventLoop):
+        players, self.waiting = self.waiting, []
+        self.print("starting table", self.num_tables, "with", players)
+        if self.games_per_table == 1:
+            play = partial(run_game, players, verbose=self.verbose, limits=self.limits, metrics=self.metrics)
+        else:
+            play = partial(run_match, players, self.games_per_table, verbose=self.verbose, limits=self.limits,
+                           metrics=self.metrics)
+        table = loop.run_in_executor(self.executor, play)
+        table.add_done_callback(partial(self.table_finished, players))
+        self.tables.append(table)
+        self.num_tables += 1
+
+    def table_finished(self, players: List[Player], table: asyncio.Future):
+        self.tables.remove(table)
+        if table.exception() is not None:
+            print("table crashed:", repr(table.exception()))
+            # the game ended without saying Goodbye, so the players left at the table would wait forever
+            for player in players:
+                writer = player.coms.transport.writer
+                if writer.is_closing():
+                    continue
+                try:
+                    player.coms.close()
+                except Exception:
+                    pass
+                writer.close()
+
+    async def serve(self, endpoint: Optional[str] = None):
+        listener = listen(endpoint)
+        path = socket_file(listener)
+        server = await asyncio.start_server(self.handle_connection, sock=listener)
+        print("dealer is listening at {}".format(endpoint_of(listener)))
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if path is not None:
+                remove_socket_file(path)
+
+
+def run_server(num_players: int, endpoint: Optional[str] = None, verbose=False, limits: Optional[ActionLimits] = None,
+               games_per_table=1, metrics: Optional[DealerMetrics] = None):
+    asyncio.run(TableServer(num_players, verbose=verbose, limits=limits, games_per_table=games_per_table,
+                            metrics=metrics).serve(endpoint))
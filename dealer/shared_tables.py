@@ -0,0 +1,65 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, Callable, Union
+
+HEADER = struct.Struct("<4sc8sI")
+ENTRY = struct.Struct("<16scQQ")
+
+Table = Union[array, memoryview]
+
+
+def write_tables(path: str, magic: bytes, tables: Dict[str, array], version=b""):
+    # Arrays are stored in native byte order, which is recorded in the header and checked on attach, along with
+    # a version of up to 8 bytes that identifies how the tables were built.
+    offset = HEADER.size + ENTRY.size * len(tables)
+    entries = []
+    for name, table in tables.items():
+        offset += -offset % table.itemsize
+        entries.append((name, table, offset))
+        offset += len(table) * table.itemsize
+
+    tmp_path = "{}.{}.tmp".format(path, os.getpid())
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(magic, sys.byteorder[0].encode(), version, len(tables)))
+        for name, table, table_offset in entries:
+            f.write(ENTRY.pack(name.encode(), table.typecode.encode(), table_offset, len(table)))
+        for name, table, table_offset in entries:
+            f.write(b"\0" * (table_offset - f.tell()))
+            table.tofile(f)
+    os.replace(tmp_path, path)
+
+
+def attach_tables(path: str, magic: bytes, version=b"") -> Dict[str, memoryview]:
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    file_magic, byteorder, file_version, num_tables = HEADER.unpack_from(view)
+    if file_magic != magic or byteorder != sys.byteorder[0].encode() or file_version != version.ljust(8, b"\0"):
+        raise ValueError("{} does not hold the expected tables".format(path))
+
+    tables = {}
+    for i in range(num_tables):
+        name, typecode, offset, length = ENTRY.unpack_from(view, HEADER.size + i * ENTRY.size)
+        itemsize = array(typecode.decode()).itemsize
+        if offset + length * itemsize > len(view):
+            raise ValueError("{} is truncated".format(path))
+        tables[name.rstrip(b"\0").decode()] = view[offset:offset + length * itemsize].cast(typecode.decode())
+    return tables
+
+
+def load_tables(path: str, magic: bytes, build: Callable[[], Dict[str, array]], version=b"") -> Dict[str, Table]:
+    # Every process maps the same file read-only, so the pages are shared through the OS page cache and the
+    # tables are only built by the first process to need them. A file with a different version is rebuilt.
+    try:
+        return attach_tables(path, magic, version)
+    except (OSError, ValueError, struct.error):
+        pass
+    tables = build()
+    try:
+        write_tables(path, magic, tables, version)
+        return attach_tables(path, magic, version)
+    except (OSError, ValueError):
+        return tables
@@ -0,0 +1,91 @@
+import socket
+from collections import deque
+from typing import Optional
+
+from . import binary_protocol as bp
+
+
+class SocketTransport:
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def send(self, data: str):
+        self.send_bytes(data.encode("utf8"))
+
+    def send_bytes(self, data: bytes):
+        self.conn.sendall(data)
+
+    def recv(self, max_bytes: int, timeout: Optional[float] = None) -> str:
+        return self.recv_bytes(max_bytes, timeout=timeout).decode("utf8")
+
+    def recv_bytes(self, max_bytes: int, timeout: Optional[float] = None) -> bytes:
+        self.conn.settimeout(timeout)
+        try:
+            return self.conn.recv(max_bytes)
+        except socket.timeout:
+            raise TimeoutError("no reply within {} seconds".format(timeout))
+        finally:
+            self.conn.settimeout(None)
+
+    def discard_pending(self) -> bytes:
+        """Reads and returns whatever has already arrived, without waiting for more."""
+        discarded = bytearray()
+        self.conn.setblocking(False)
+        try:
+            while True:
+                data = self.conn.recv(4096)
+                if len(data) == 0:
+                    break
+                discarded += data
+        except BlockingIOError:
+            pass
+        finally:
+            self.conn.setblocking(True)
+        return bytes(discarded)
+
+    def close(self):
+        self.conn.close()
+
+
+class DirectTransport:
+    """Hands dealer output straight to an in-process bot's handle_line and queues its replies.
+
+    Binary protocol frames go to the bot's handle_frame instead, and its replies are queued as ACTION frames.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._partial_line = ""
+        self._partial_frame = bytearray()
+        self._replies = deque()
+
+    def send(self, data: str):
+        lines = (self._partial_line + data).split("\n")
+        self._partial_line = lines.pop()
+        for line in lines:
+            reply = self.bot.handle_line(line)
+            if reply is not None:
+                self._replies.append(reply + "\n")
+
+    def send_bytes(self, data: bytes):
+        self._partial_frame += data
+        for payload in bp.split_frames(self._partial_frame):
+            reply = self.bot.handle_frame(payload)
+            if reply is not None:
+                self._replies.append(bp.encode_action(reply))
+
+    def recv(self, max_bytes: int, timeout: Optional[float] = None) -> str:
+        if len(self._replies) == 0:
+            raise Exception("{} has nothing to say".format(self.bot.player_name))
+        return self._replies.popleft()
+
+    def recv_bytes(self, max_bytes: int, timeout: Optional[float] = None) -> bytes:
+        return self.recv(max_bytes, timeout=timeout)
+
+    def discard_pending(self) -> bytes:
+        self._replies.clear()  # the bot answers as soon as it is asked, so there is never a late reply to drop
+        return b""
+
+    def close(self):
+        pass
@@ -1,18 +1,22 @@
-from typing import List
-from random import random
-
-from dealer.main import run_game_for_n_players
-from player.base_player import PokerPlayer
-from player.basic_heuristic_player import high_card_player
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple, Optional
+
+from dealer.headless import seat_bots
+from dealer.match import Match
+from player.base_player import PokerBot
 from player.basic_heuristic_player import partial_score_player
 from player.random_player import random_player
 
-from threading import Thread
-
 player_num = 3
 rand_player_num = 1
 base_value = (0.3, 0.6)
 delta = 0.4
+games_per_round = 20
+duplicate = True
+max_hands = 1000
+workers = None
 
 
 def main():
@@ -35,48 +39,45 @@ def get_new_inputs(best_value):
     inputs = []
     for _ in range(player_num):
         fold_threshold, call_threshold = best_value
-        fold_threshold = max(fold_threshold + random() * delta - (delta / 2), 0)
-        call_threshold = max(call_threshold + random() * delta - (delta / 2), 0)
+        fold_threshold = max(fold_threshold + random.random() * delta - (delta / 2), 0)
+        call_threshold = max(call_threshold + random.random() * delta - (delta / 2), 0)
         inputs.append((fold_threshold, call_threshold))
     return inputs
 
 
 def run_some_games(inputs):
     results = [0] * (player_num + rand_player_num)
-    for _ in range(20):
-        run_game(inputs, results)
-        print(".", end="")
+    rotations = list(range(player_num + rand_player_num)) if duplicate else [0]
+    seeds = [random.getrandbits(32) for _ in range(max(1, games_per_round // len(rotations)))]
+    # each job is a match over a run of seeds, so its bots are only built and seated once
+    num_chunks = max(1, min(len(seeds), (workers or os.cpu_count() or 1) // len(rotations)))
+    chunks = [seeds[i::num_chunks] for i in range(num_chunks)]
+    jobs = [(chunk, rotation) for chunk in chunks for rotation in rotations]
+    with ProcessPoolExecutor(workers) as pool:
+        for winners in pool.map(run_games, [inputs] * len(jobs), *zip(*jobs)):
+            for winner in winners:
+                if winner is not None:
+                    results[winner] += 1
+                print(".", end="")
     print(results)
     return results
 
 
-def run_game(inputs, results):
-    server_thread = start_server()
-    players: List[PokerPlayer] = [partial_score_player(False, fold, call) for (fold, call) in inputs] \
-                                 + [random_player(False) for _ in range(rand_player_num)]
-    threads = []
-    for i, player in enumerate(players):
-        player.coms.verbose = False
-        threads.append(start_player(player, results, i))
-    server_thread.join()
-    for thread in threads:
-        thread.join()
-
-
-def start_server():
-    t = Thread(target=run_game_for_n_players, args=(player_num + rand_player_num,), kwargs={"verbose": False})
-    t.start()
-    return t
-
-
-def start_player(p: PokerPlayer, results, i):
-    def func():
-        if p.play():
-            results[i] += 1
-
-    t = Thread(target=func)
-    t.start()
-    return t
+def run_games(inputs: List[Tuple[float, float]], seeds: List[int], rotation=0) -> List[Optional[int]]:
+    # In duplicate mode the same seed is replayed with the seats rotated, so every player is dealt every seat's
+    # cards once and card luck cancels out of the comparison.
+    players: List[PokerBot] = [partial_score_player(False, fold, call, PokerBot, "player{}".format(i))
+                               for i, (fold, call) in enumerate(inputs)] \
+        + [random_player(False, PokerBot, "random{}".format(i)) for i in range(rand_player_num)]
+    seated = players[rotation:] + players[:rotation]
+    match = Match(seat_bots(seated), verbose=False)
+    winners = []
+    for seed in seeds:
+        random.seed(seed)
+        match.play_game(seed=seed, max_hands=max_hands)
+        winners.append(next((i for i, player in enumerate(players) if player.result), None))
+    match.close()
+    return winners
 
 
 if __name__ == "__main__":
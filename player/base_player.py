@@ -1,42 +1,72 @@
-import socket
 import random
+from collections import deque
+from functools import lru_cache
 from os.path import dirname, join
-from typing import Dict, Tuple, List, Callable, Union
+from typing import Dict, Tuple, List, Callable, Union, Optional
 
-from dealer.cards import Card, card_name_lookup
+from dealer.cards import card_name_lookup, card_mask
+from dealer.evaluator import IncrementalEvaluator
+from dealer import binary_protocol as bp
+from dealer import endpoints
 
 
-def get_local_ip() -> str:
-    address_list = socket.gethostbyname_ex(socket.gethostname())[2]
-    ip_addresses = [a for a in address_list if a.startswith("192.168.1.")]
-    if len(ip_addresses) < 1:
-        raise Exception("Could not find an address that looks like a local ip")
-    return ip_addresses[0]
+@lru_cache(maxsize=None)
+def load_names() -> Tuple[str, ...]:
+    with open(join(dirname(__file__), "names.txt"), "r") as f:
+        return tuple(name.strip() for name in f)
+
+
+RECV_SIZE = 65536
+
+
+def complete_utf8_length(data: bytearray) -> int:
+    """The length of the longest prefix of data that does not end part way through a utf8 character."""
+    n = len(data)
+    for i in range(n - 1, max(n - 4, 0) - 1, -1):
+        byte = data[i]
+        if byte & 0xC0 != 0x80:
+            size = 1 if byte < 0x80 else 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+            return n if i + size <= n else i
+    return n
 
 
 class PokerPlayerCommunicator:
-    __slots__ = ["_socket", "_lines_buffer", "_line_buffer", "verbose"]
+    """Reads into one reusable buffer with recv_into. Bytes are only decoded once the lines they make up are complete,
+    so a burst of lines costs one recv and one decode however many lines it holds."""
+    __slots__ = ["_socket", "_recv_buffer", "_recv_view", "_incoming", "_lines", "_frames", "verbose"]
 
     def __init__(self, verbose=False):
         self._socket = None
-        self._lines_buffer = []
-        self._line_buffer = ""
+        self._recv_buffer = bytearray(RECV_SIZE)
+        self._recv_view = memoryview(self._recv_buffer)
+        self._incoming = bytearray()
+        self._lines = deque()
+        self._frames = deque()
         self.verbose = verbose
 
-    def connect(self, ip_address=None, port=8080):
-        if ip_address is None:
-            ip_address = get_local_ip()
-        self._socket = socket.socket()
-        self._socket.connect((ip_address, port))
+    def connect(self, endpoint: Optional[str] = None):
+        """Connects to a tcp://, unix:// or fd:// endpoint, see dealer.endpoints, by default DEALER_ENDPOINT."""
+        self._socket = endpoints.connect(endpoint)
         if self.verbose:
-            print("Connected to {}:{}".format(ip_address, port))
+            print("Connected to {}".format(endpoint or endpoints.default_endpoint()))
 
-    def read(self, verbose=True):
+    def _fill(self):
         if self._socket is None:
-            raise Exception("Need to connect before calling read")
-        result = self._socket.recv(100).decode("utf8")
-        if result == "":
+            raise Exception("Need to connect before reading")
+        size = self._socket.recv_into(self._recv_buffer)
+        if size == 0:
             raise Exception("Connection is closed")
+        self._incoming += self._recv_view[:size]
+
+    def read(self, verbose=True):
+        if len(self._incoming) == 0:
+            self._fill()
+        length = complete_utf8_length(self._incoming)
+        while length == 0:
+            self._fill()
+            length = complete_utf8_length(self._incoming)
+        result = self._incoming[:length].decode("utf8")
+        del self._incoming[:length]
         if self.verbose and verbose:
             print("Received:", result, end="")
         return result
@@ -46,22 +76,18 @@ class PokerPlayerCommunicator:
             raise Exception("Need to connect before calling send")
         if self.verbose:
             print("Sending:", string, end="")
-        self._socket.send(string.encode("utf8"))
+        self._socket.sendall(string.encode("utf8"))
 
     def read_line(self) -> str:
-        while len(self._lines_buffer) == 0:
-            lines = self.read(verbose=False)
-            lines = lines.split("\n")
-            if len(lines) > 1:
-                self._lines_buffer.append(self._line_buffer + lines[0])
-                self._line_buffer = ""
-
-                for line in lines[1:-1]:
-                    self._lines_buffer.append(line)
-
-            self._line_buffer += lines[-1]
+        while len(self._lines) == 0:
+            end = self._incoming.rfind(b"\n")
+            if end < 0:
+                self._fill()
+                continue
+            self._lines.extend(self._incoming[:end].decode("utf8").split("\n"))
+            del self._incoming[:end + 1]
 
-        result = self._lines_buffer.pop(0)
+        result = self._lines.popleft()
         if self.verbose:
             print("Received:", result)
         return result
@@ -69,6 +95,22 @@ class PokerPlayerCommunicator:
     def send_line(self, string: str) -> None:
         self.send(string + "\n")
 
+    def read_frame(self) -> bytes:
+        if len(self._frames) == 0:
+            self._frames.extend(bp.split_frames(self._incoming))
+        while len(self._frames) == 0:
+            self._fill()
+            self._frames.extend(bp.split_frames(self._incoming))
+        payload = self._frames.popleft()
+        if self.verbose:
+            print("Received:", bp.decode(payload))
+        return payload
+
+    def send_action_frame(self, action: str) -> None:
+        if self.verbose:
+            print("Sending:", action)
+        self._socket.sendall(bp.encode_action(action))
+
 
 class Player:
     __slots__ = ["name", "holdings", "folded", "actions", "bet"]
@@ -86,14 +128,18 @@ class Player:
 
 
 class GameStatus:
-    __slots__ = ["internal", "you", "players", "hand", "community_cards", "pot_amount", "pot_bet", "your_bet"]
+    __slots__ = ["internal", "you", "players", "hand", "community_cards", "hand_mask", "board_mask", "evaluator",
+                 "pot_amount", "pot_bet", "your_bet"]
 
     def __init__(self, name):
         self.internal: Dict = dict()
         self.you: Player = Player(name)
         self.players: Dict[str, Player] = {}
-        self.hand: List[Card] = []
-        self.community_cards: List[Card] = []
+        self.hand: List[int] = []
+        self.community_cards: List[int] = []
+        self.hand_mask: int = 0
+        self.board_mask: int = 0
+        self.evaluator: IncrementalEvaluator = IncrementalEvaluator()
         self.pot_amount: int = 0
         self.pot_bet: int = 0
         self.your_bet: int = 0
@@ -107,148 +153,351 @@ class GameStatus:
 ActionDecider = Callable[[GameStatus, bool], Union[str, Tuple[str, int]]]
 
 
-class PokerPlayer:
+LineHandler = Callable[[str], None]
+
+
+class PokerBot:
+    """Keeps track of the game from the dealer's messages and asks decide_action what to do when it is your turn.
+
+    Text lines are dispatched through line_handlers, keyed by the whole line, by the text before the first ":" or
+    by the first word, whichever matches first. Binary frames are dispatched by message type. Either way the bot
+    updates its GameStatus and then tells any listeners added with subscribe about the event:
+
+        new_game(game_num)                    new_hand()
+        players_in(names)                     hand(cards)
+        reveal(cards)                         opponent_action(name, action)
+        result(won)                           game_over()
+    """
 
     def __init__(self, decide_action: ActionDecider, player_name=None, verbose=True):
         self.decide_action = decide_action
         if player_name is None:
-            with open(join(dirname(__file__), "names.txt"), "r") as f:
-                names = f.readlines()
-            self.player_name = names[random.randint(0, 4944)].strip()
+            self.player_name = random.choice(load_names())
         else:
             self.player_name = player_name
-        self.coms = PokerPlayerCommunicator(verbose=verbose)
-        self.coms.connect()
         self.game_status = GameStatus(self.player_name)
         self.verbose = verbose
+        self.result: Optional[bool] = None
+        self.finished = False
+        self._follow_up: Optional[LineHandler] = None
+        self._follow_up_lines = 0
+        self._listeners: Dict[str, List[Callable]] = {}
+        self.line_handlers: Dict[str, Callable[[str], Optional[str]]] = {
+            "Goodbye": lambda line: self.finish(),
+            "New game": self.on_new_game,
+            "Fold/Call": self.on_options,
+            "Fold/Call/Raise": self.on_options,
+            "SUCCESS": ignore_line,
+            "ERROR": lambda line: self.print("--Action was rejected: " + line),
+            "Auto action": lambda line: self.print("--The dealer acted for you: " + line),
+            "----": self.on_new_hand,
+            "The following players are still in": self.on_players_in,
+            "Money left": self.on_money_left,
+            "Hand": self.on_hand,
+            "Reveal": self.on_reveal,
+            "Current pot": self.on_current_pot,
+            "Current pot bet": self.on_current_pot_bet,
+            "Your current bet": self.on_your_current_bet,
+            "Your holdings": self.on_your_holdings,
+            "Opponent action": self.on_opponent_action,
+            "Results": self.on_results,
+            "Pots": self.on_results,
+            "Winnings": self.on_winnings,
+            "Big": ignore_line,
+            "Small": ignore_line,
+            "You are big blind": ignore_line,
+            "You are small blind": ignore_line,
+            "You are not the blind": ignore_line,
+            "You have folded so cannot bet": ignore_line,
+            "You have no more money so cannot bet": ignore_line,
+            "You ran out of money": lambda line: self.set_result(False),
+            "YOU ARE THE CHAMPION": lambda line: self.set_result(True),
+        }
+        self._message_handlers: Dict[int, Callable] = {
+            bp.NEW_HAND: lambda round_num: self.reset_hand(),
+            bp.PLAYERS_IN: self.set_players_in,
+            bp.MONEY: self.set_all_holdings,
+            bp.HAND: self.set_hand,
+            bp.REVEAL: self.add_community_cards,
+            bp.STATUS: self.set_status,
+            bp.OPTIONS: lambda raise_available: self.choose_action(raise_available == 1),
+            bp.ERROR: lambda message: self.print("--Action was rejected: " + message),
+            bp.AUTO_ACTION: lambda action, reason: self.print("--The dealer acted for you: " + reason),
+            bp.OPPONENT_ACTION: lambda name, action, raise_amount, bet:
+                self.apply_opponent_action(name, bp.ACTION_NAMES[action], raise_amount),
+            bp.OUT_OF_MONEY: lambda: self.set_result(False),
+            bp.CHAMPION: lambda: self.set_result(True),
+            bp.GOODBYE: self.finish,
+            bp.NEW_GAME: self.new_game,
+        }
 
     def print(self, x):
         if self.verbose:
             print(x)
 
-    def play(self):
+    def subscribe(self, event: str, listener: Callable):
+        self._listeners.setdefault(event, []).append(listener)
+
+    def emit(self, event: str, *args):
+        listeners = self._listeners.get(event)
+        if listeners is not None:
+            for listener in listeners:
+                listener(*args)
+
+    def expect_lines(self, num_lines: int, handler: LineHandler):
+        self._follow_up = handler
+        self._follow_up_lines = num_lines
+
+    def handle_line(self, line: str) -> Optional[str]:
+        if self._follow_up_lines > 0:
+            self._follow_up_lines -= 1
+            self._follow_up(line)
+            return None
+
+        handlers = self.line_handlers
+        handler = handlers.get(line)
+        if handler is None:
+            colon = line.find(":")
+            if colon >= 0:
+                handler = handlers.get(line[:colon])
+            if handler is None:
+                handler = handlers.get(line.split(" ", 1)[0])
+                if handler is None:
+                    raise Exception("line not handled:", line)
+        return handler(line)
+
+    def on_options(self, line: str) -> str:
+        self.print("--Input the move")
+        return self.choose_action("Raise" in line)
+
+    def on_new_game(self, line: str):
+        self.new_game(int(line.split(": ")[1]))
+
+    def on_new_hand(self, line: str):
+        self.print("--Resetting hand state")
+        self.reset_hand()
+
+    def on_players_in(self, line: str):
+        self.print("--Getting which players are still in")
+        names = line.split(":", maxsplit=1)[1].strip()
+        self.set_players_in([name.strip() for name in names.split(",")])
+
+    def on_money_left(self, line: str):
+        self.print("--Getting how much money everyone has")
+        self.expect_lines(len(self.game_status.players) + 1, self.read_money_line)
+
+    def on_hand(self, line: str):
+        self.print("--Getting my hand cards")
+        self.expect_lines(1, lambda cards: self.set_hand(parse_cards(cards)))
+
+    def on_reveal(self, line: str):
+        self.print("--Getting revealed cards")
+        self.expect_lines(1, lambda cards: self.add_community_cards(parse_cards(cards)))
+
+    def on_current_pot(self, line: str):
+        self.print("--Getting current pot")
+        self.game_status.pot_amount = int(line.split(":")[1].strip())
+
+    def on_current_pot_bet(self, line: str):
+        self.print("--Getting current pot bet")
+        self.game_status.pot_bet = int(line.split(":")[1].strip())
+
+    def on_your_current_bet(self, line: str):
+        self.print("--Getting your current bet")
+        self.game_status.your_bet = int(line.split(":")[1].strip())
+
+    def on_your_holdings(self, line: str):
+        self.print("--Getting your holdings")
+        self.game_status.you.holdings = int(line.split(":")[1].strip())
+
+    def on_opponent_action(self, line: str):
+        self.print("--Getting opponent action")
+        player_name, action = (x.strip() for x in line.split(":")[1].strip().split(" ", maxsplit=1))
+        self.record_opponent_action(player_name, action)
+
+    def on_results(self, line: str):
+        # "Results [n]" and "Pots [n]" are followed by n lines
+        self.print("--Getting results")
+        self.expect_lines(int(line.split(" ")[1][1:-1]), ignore_line)
+
+    def on_winnings(self, line: str):
+        self.print("--Getting winnings")
+        self.expect_lines(len(self.game_status.players) + 1, ignore_line)
+
+    def handle_frame(self, payload: bytes) -> Optional[str]:
+        """The binary protocol counterpart of handle_line. Messages without a handler are skipped undecoded."""
+        handler = self._message_handlers.get(payload[0])
+        if handler is None:
+            return None
+        return handler(*bp.decode(payload)[1:])
+
+    def set_result(self, result: bool):
+        self.print("--You win" if result else "--You lose")
+        self.result = result
+        self.emit("result", result)
+
+    def new_game(self, game_num: int):
+        """Starts over for the next game of a match, which is played over the same connection."""
+        self.print("--Game {} is starting".format(game_num))
+        self.game_status = GameStatus(self.player_name)
+        self.result = None
+        self.finished = False
+        self._follow_up = None
+        self._follow_up_lines = 0
+        self.emit("new_game", game_num)
+
+    def finish(self):
+        self.print("--Game is over")
+        self.finished = True
+        self.emit("game_over")
+
+    def set_all_holdings(self, holdings: List[Tuple[str, int]]):
+        for name, amount in holdings:
+            if name == "":
+                self.game_status.you.holdings = amount
+            else:
+                self.game_status.players[name].holdings = amount
+
+    def set_status(self, pot_amount: int, pot_bet: int, your_bet: int, holdings: int):
+        self.game_status.pot_amount = pot_amount
+        self.game_status.pot_bet = pot_bet
+        self.game_status.your_bet = your_bet
+        self.game_status.you.holdings = holdings
+
+    def choose_action(self, raise_available: bool) -> str:
+        action = self.decide_action(self.game_status, raise_available)
+        self.game_status.you.actions[-1].append(action)
+        if type(action) is tuple:
+            action = " ".join((str(i) for i in action))
+        elif not type(action) is str:
+            action = str(action)
+        return action
+
+    def reset_hand(self):
+        if len(self.game_status.you.actions[-1]) > 0:
+            self.game_status.you.actions.append([])
+        for player in self.game_status.players.values():
+            player.actions.append([])
+            player.folded = False
+            player.bet = 0
+        self.game_status.hand = []
+        self.game_status.community_cards = []
+        self.game_status.hand_mask = 0
+        self.game_status.board_mask = 0
+        self.game_status.evaluator = IncrementalEvaluator()
+        self.game_status.pot_amount = 0
+        self.game_status.pot_bet = 0
+        self.game_status.your_bet = 0
+        self.emit("new_hand")
+
+    def set_players_in(self, names: List[str]):
+        self.print("{} players still in".format(len(names)))
+        if len(self.game_status.players) == 0:
+            self.game_status.players = {name: Player(name) for name in names if name != self.player_name}
+        else:
+            self.game_status.players = {player.name: player for player in self.game_status.players.values()
+                                        if player.name in names}
+        self.emit("players_in", names)
+
+    def read_money_line(self, line: str):
+        line = line.split(":", maxsplit=1)
+        self.set_holdings(line[0], int(line[1].strip()))
+
+    def set_holdings(self, name: str, holdings: int):
+        if name.startswith("You"):
+            self.game_status.you.holdings = holdings
+        else:
+            self.game_status.players[name].holdings = holdings
+
+    def set_hand(self, cards: List[int]):
+        self.game_status.hand = cards
+        self.game_status.hand_mask = card_mask(cards)
+        self.game_status.evaluator = IncrementalEvaluator(cards)
+        self.emit("hand", cards)
+
+    def add_community_cards(self, cards: List[int]):
+        self.game_status.community_cards += cards
+        self.game_status.board_mask |= card_mask(cards)
+        for card in cards:
+            self.game_status.evaluator.push(card)
+        self.emit("reveal", cards)
+
+    def record_opponent_action(self, player_name: str, action: str):
+        if action == "Folded":
+            self.apply_opponent_action(player_name, "Fold", 0)
+        elif action == "Called":
+            self.apply_opponent_action(player_name, "Call", 0)
+        else:  # Raised by x to y
+            self.apply_opponent_action(player_name, "Raise", int(action.split(" ")[2]))
+
+    def apply_opponent_action(self, player_name: str, action: str, raise_amount: int):
+        player: Player = self.game_status.players[player_name]
+        if action == "Fold":
+            player.folded = True
+        elif action == "Call":
+            diff = self.game_status.pot_bet - player.bet
+            player.holdings -= diff
+            player.bet = self.game_status.pot_bet
+        else:
+            action = "Raise", raise_amount
+            diff = self.game_status.pot_bet - player.bet + raise_amount
+            player.holdings -= diff
+            player.bet = self.game_status.pot_bet + raise_amount
+        player.actions[-1].append(action)
+        self.emit("opponent_action", player_name, action)
+
+
+def parse_cards(cards: str) -> List[int]:
+    return [card_name_lookup[name.strip()].code for name in cards.split(",")]
+
+
+def ignore_line(line: str):
+    pass
+
+
+class PokerPlayer(PokerBot):
+
+    def __init__(self, decide_action: ActionDecider, player_name=None, verbose=True, binary=False,
+                 endpoint: Optional[str] = None):
+        super().__init__(decide_action, player_name=player_name, verbose=verbose)
+        self.binary = binary
+        self.coms = PokerPlayerCommunicator(verbose=verbose)
+        self.coms.connect(endpoint)
+
+    def join(self):
+        """Gives the lobby our name, asking for the binary protocol if we want it."""
         self.coms.read()  # what is your name
-        self.coms.send_line(self.player_name)
-        self.coms.read()  # welcome
+        if self.binary:
+            self.coms.send_line(self.player_name + " binary")
+        else:
+            self.coms.send_line(self.player_name)
+            self.coms.read_line()  # welcome, which the first lines of the game can follow in the same packet
+
+    def play_game(self) -> Optional[bool]:
+        """Plays until we win, go out or the dealer says Goodbye. In a match the next game's first message resets
+        the result, so this can be called again for each game."""
         while True:
-            line = self.coms.read_line()
-            if line == "Goodbye":  # Game over
-                self.print("--Game is over")
-                break
-            elif line.startswith("Fold/Call"):
-                self.print("--Input the move")
-                while True:
-                    action = self.decide_action(self.game_status, "Raise" in line)
-                    self.game_status.you.actions[-1].append(action)
-                    if type(action) is tuple:
-                        action = " ".join((str(i) for i in action))
-                    elif not type(action) is str:
-                        action = str(action)
-                    self.coms.send_line(action)
-                    response = self.coms.read_line()
-                    if response.startswith("SUCCESS"):
-                        break
-                    self.coms.read_line()  # New prompt
-            elif line.startswith("---- New Hand"):
-                self.print("--Resetting hand state")
-                if len(self.game_status.you.actions[-1]) > 0:
-                    self.game_status.you.actions.append([])
-                for player in self.game_status.players.values():
-                    player.actions.append([])
-                    player.folded = False
-                    player.bet = 0
-                self.game_status.hand = []
-                self.game_status.community_cards = []
-                self.game_status.pot_amount = 0
-                self.game_status.pot_bet = 0
-                self.game_status.your_bet = 0
-            elif line.startswith("The following players are still in:"):
-                self.print("--Getting which players are still in")
-                names = line.split(":", maxsplit=1)[1].strip()
-                names = [name.strip() for name in names.split(",")]
-                self.print("{} players still in".format(len(names)))
-                if len(self.game_status.players) == 0:
-                    self.game_status.players = {name: Player(name) for name in names if name != self.player_name}
-                else:
-                    self.game_status.players = {player.name: player for player in self.game_status.players.values()
-                                                if player.name in names}
-
-            elif line == "Money left":
-                self.print("--Getting how much money everyone has")
-                for _ in range(len(self.game_status.players) + 1):
-                    line = self.coms.read_line()
-                    line = line.split(":", maxsplit=1)
-                    holdings = int(line[1].strip())
-                    if line[0].startswith("You"):
-                        self.game_status.you.holdings = holdings
-                    else:
-                        self.game_status.players[line[0]].holdings = holdings
-            elif line == "Hand":
-                self.print("--Getting my hand cards")
-                cards = self.coms.read_line()
-                card_names = (name.strip() for name in cards.split(","))
-                self.game_status.hand = [card_name_lookup[name] for name in card_names]
-            elif line.startswith("Reveal"):
-                self.print("--Getting revealed cards")
-                cards = self.coms.read_line()
-                card_names = (name.strip() for name in cards.split(","))
-                self.game_status.community_cards += [card_name_lookup[name] for name in card_names]
-            elif line.startswith("Current pot:"):
-                self.print("--Getting current pot")
-                self.game_status.pot_amount = int(line.split(":")[1].strip())
-            elif line.startswith("Current pot bet:"):
-                self.print("--Getting current pot bet")
-                self.game_status.pot_bet = int(line.split(":")[1].strip())
-            elif line.startswith("Your current bet:"):
-                self.print("--Getting your current bet")
-                self.game_status.your_bet = int(line.split(":")[1].strip())
-            elif line.startswith("Your holdings:"):
-                self.print("--Getting your holdings")
-                self.game_status.you.holdings = int(line.split(":")[1].strip())
-            elif line.startswith("Opponent action"):
-                self.print("--Getting opponent action")
-                player_name, action = (x.strip() for x in line.split(":")[1].strip().split(" ", maxsplit=1))
-                player: Player = self.game_status.players[player_name]
-                if action == "Folded":
-                    player.folded = True
-                    action = "Fold"
-                elif action == "Called":
-                    action = "Call"
-                    diff = self.game_status.pot_bet - player.bet
-                    player.holdings -= diff
-                    player.bet = self.game_status.pot_bet
-                else:  # Raise
-                    raise_amount = int(action.split(" ")[2])
-                    action = "Raise", raise_amount
-                    diff = self.game_status.pot_bet - player.bet + raise_amount
-                    player.holdings -= diff
-                    player.bet = self.game_status.pot_bet + raise_amount
-                player.actions[-1].append(action)
-            elif line.startswith("Results"):
-                self.print("--Getting results")
-                num_results = int(line.split(" ")[1][1:-1])
-                for _ in range(num_results):
-                    self.coms.read_line()  # Ignore
-            elif line.startswith("Pots"):
-                self.print("--Getting pot winners")
-                num_pots = int(line.split(" ")[1][1:-1])
-                for _ in range(num_pots):
-                    self.coms.read_line()  # Ignore
-            elif line == "Winnings":
-                self.print("--Getting winnings")
-                for _ in range(len(self.game_status.players) + 1):
-                    self.coms.read_line()  # Ignore
-            elif "blind" in line:
-                pass
-            elif line == "You have folded so cannot bet":
-                pass
-            elif line == "You have no more money so cannot bet":
-                pass
-            elif line == "You ran out of money":
-                self.print("--You lose")
-                return False
-            elif line == "YOU ARE THE CHAMPION":
-                self.print("--You win")
-                return True
+            if self.binary:
+                reply = self.handle_frame(self.coms.read_frame())
+                if reply is not None:
+                    self.coms.send_action_frame(reply)
             else:
-                raise Exception("line not handled:", line)
+                reply = self.handle_line(self.coms.read_line())
+                if reply is not None:
+                    self.coms.send_line(reply)
+            if self.result is not None or self.finished:
+                return self.result
+
+    def play(self) -> Optional[bool]:
+        self.join()
+        return self.play_game()
+
+    def play_match(self) -> List[Optional[bool]]:
+        """Joins once and plays games until the dealer says Goodbye, returning whether we won each one."""
+        self.join()
+        results = []
+        while True:
+            result = self.play_game()
+            if self.finished:
+                return results
+            results.append(result)
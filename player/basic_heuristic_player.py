@@ -1,10 +1,11 @@
-from typing import Callable, List
+from typing import Callable
 from math import exp
-from os.path import join, dirname
 
-from dealer.cards import Card
+from . import preflop
 from .base_player import PokerPlayer, GameStatus
-from dealer.hand_scorer import high_card, get_partial_hand_max, get_cards_max, all_same, get_suit
+from .equity import equity, count_opponents
+from dealer.hand_scorer import high_card
+from dealer.evaluator import MAX_RANK
 
 
 def heuristic_decide_action(get_confidence: Callable[[GameStatus], float], fold_threshold=0.3,
@@ -33,40 +34,33 @@ def high_card_confidence(game_status: GameStatus) -> float:
 def partial_score_confidence(game_status: GameStatus) -> float:
     cards = game_status.hand + game_status.community_cards
     if len(cards) < 5:
-        return hand_start_scorer(cards) / 3
+        first, second = game_status.hand
+        return preflop_scorer(first, second, count_opponents(game_status))
     else:
-        return get_partial_hand_max(cards).value / (9*13)
-
-
-def from_file():
-    with open(join(dirname(__file__), "poker_hands.txt")) as f:
-        lines = f.readlines()
-    lookup = {}
-    for line in lines:
-        k, v = line.strip().split("\t", 1)
-        lookup[k] = v
-
-    def func(cards: List[Card]) -> float:
-        k = "".join([card.name.split(" ")[0] for card in cards])
-        if all_same([get_suit(card) for card in cards]):
-            k += "s"
-        if k in lookup:
-            return float(lookup[k])
-        else:
-            return 0
-    return func
+        return game_status.evaluator.best / MAX_RANK
+
+
+def equity_confidence(game_status: GameStatus) -> float:
+    win, tie = equity(game_status, time_budget=0.05)
+    return win + tie / 2
 
 
-hand_start_scorer = from_file()
+preflop_scorer = preflop.from_file()
 
 
-def high_card_player(verbose, fold_threshold, call_threshold):
-    return PokerPlayer(
+def high_card_player(verbose, fold_threshold, call_threshold, player_class=PokerPlayer, player_name=None):
+    return player_class(
         heuristic_decide_action(high_card_confidence, fold_threshold=fold_threshold, call_threshold=call_threshold),
-        verbose=verbose)
+        player_name=player_name, verbose=verbose)
 
 
-def partial_score_player(verbose, fold_threshold, call_threshold):
-    return PokerPlayer(
+def partial_score_player(verbose, fold_threshold, call_threshold, player_class=PokerPlayer, player_name=None):
+    return player_class(
         heuristic_decide_action(partial_score_confidence, fold_threshold=fold_threshold, call_threshold=call_threshold),
-        verbose=verbose)
+        player_name=player_name, verbose=verbose)
+
+
+def equity_player(verbose, fold_threshold, call_threshold, player_class=PokerPlayer, player_name=None):
+    return player_class(
+        heuristic_decide_action(equity_confidence, fold_threshold=fold_threshold, call_threshold=call_threshold),
+        player_name=player_name, verbose=verbose)
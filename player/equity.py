@@ -0,0 +1,115 @@
+import random
+from concurrent.futures import Executor
+from functools import lru_cache
+from itertools import combinations, permutations
+from time import perf_counter
+from typing import List, Tuple, Optional
+
+from dealer.cards import full_deck_mask, card_mask, mask_codes
+from dealer.evaluator import evaluate
+from .base_player import GameStatus
+
+CHECK_TIME_EVERY = 32
+EXACT_MIN_BOARD = 4
+SUIT_PERMUTATIONS = list(permutations(range(4)))
+
+
+def count_opponents(game_status: GameStatus) -> int:
+    return max(1, len([player for player in game_status.players.values() if not player.folded]))
+
+
+def sample_equity(hand: List[int], board: List[int], num_opponents: int, samples: int,
+                  time_budget: Optional[float] = None, seed=None, known_mask: Optional[int] = None) \
+        -> Tuple[int, int, int]:
+    """known_mask is the mask of hand + board when the caller already has it, as GameStatus does."""
+    rng = random.Random(seed)
+    if known_mask is None:
+        known_mask = card_mask(hand + board)
+    unseen = mask_codes(full_deck_mask & ~known_mask)
+    num_runout = 5 - len(board)
+    num_drawn = num_runout + 2 * num_opponents
+    if num_drawn > len(unseen):
+        raise Exception("not enough cards left for {} opponents".format(num_opponents))
+
+    deadline = None if time_budget is None else perf_counter() + time_budget
+    wins = ties = done = 0
+    while done < samples:
+        if deadline is not None and done % CHECK_TIME_EVERY == 0 and done > 0 and perf_counter() > deadline:
+            break
+        drawn = rng.sample(unseen, num_drawn)
+        full_board = board + drawn[:num_runout]
+        mine = evaluate(hand + full_board)
+        best_opponent = max(evaluate(drawn[i:i + 2] + full_board) for i in range(num_runout, num_drawn, 2))
+        if mine > best_opponent:
+            wins += 1
+        elif mine == best_opponent:
+            ties += 1
+        done += 1
+    return wins, ties, done
+
+
+def canonical_key(hand: List[int], board: List[int]) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    return min((tuple(sorted(perm[code // 13] * 13 + code % 13 for code in hand)),
+                tuple(sorted(perm[code // 13] * 13 + code % 13 for code in board)))
+               for perm in SUIT_PERMUTATIONS)
+
+
+# keyed by the cards with their suits renamed by canonical_key, so the mask is of those rather than the real cards
+@lru_cache(maxsize=4096)
+def runout_outcomes(hand: Tuple[int, ...], board: Tuple[int, ...]) -> Tuple[Tuple[int, int, int], ...]:
+    unseen = mask_codes(full_deck_mask & ~card_mask(hand + board))
+    outcomes = []
+    for runout in combinations(unseen, 5 - len(board)):
+        full_board = list(board) + list(runout)
+        mine = evaluate(list(hand) + full_board)
+        beats = ties = total = 0
+        for pair in combinations([code for code in unseen if code not in runout], 2):
+            theirs = evaluate(list(pair) + full_board)
+            if theirs > mine:
+                beats += 1
+            elif theirs == mine:
+                ties += 1
+            total += 1
+        outcomes.append((beats, ties, total))
+    return tuple(outcomes)
+
+
+def exact_equity(hand: List[int], board: List[int], num_opponents: int) -> Tuple[float, float]:
+    # Enumerates every runout and every holding of a single opponent. For several opponents each one is
+    # treated as an independent draw from the same holdings, which ignores the cards they take from each other.
+    outcomes = runout_outcomes(*canonical_key(hand, board))
+    win = tie = 0.0
+    for beats, ties, total in outcomes:
+        not_beaten = ((total - beats) / total) ** num_opponents
+        beat_all = ((total - beats - ties) / total) ** num_opponents
+        win += beat_all
+        tie += not_beaten - beat_all
+    return win / len(outcomes), tie / len(outcomes)
+
+
+def equity(game_status: GameStatus, samples=500, time_budget: Optional[float] = None,
+           pool: Optional[Executor] = None, workers=1) -> Tuple[float, float]:
+    hand = game_status.hand
+    board = game_status.community_cards
+    num_opponents = count_opponents(game_status)
+    known_mask = game_status.hand_mask | game_status.board_mask
+
+    if len(board) >= EXACT_MIN_BOARD:
+        return exact_equity(hand, board, num_opponents)
+    if pool is None or workers < 2:
+        wins, ties, done = sample_equity(hand, board, num_opponents, samples, time_budget, known_mask=known_mask)
+    else:
+        chunk = -(-samples // workers)
+        futures = [pool.submit(sample_equity, hand, board, num_opponents, chunk, time_budget, random.random(),
+                               known_mask)
+                   for _ in range(workers)]
+        wins = ties = done = 0
+        for future in futures:
+            w, t, d = future.result()
+            wins += w
+            ties += t
+            done += d
+
+    if done == 0:
+        return 0.0, 0.0
+    return wins / done, ties / done
@@ -0,0 +1,35 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Tuple
+
+from .equity import sample_equity
+from .preflop import NUM_CLASSES, MAX_OPPONENTS, TABLE_PATH, class_hand, class_name, write_table
+
+
+def class_equity(args: Tuple[int, int, int, int]) -> float:
+    index, num_opponents, samples, seed = args
+    wins, ties, done = sample_equity(list(class_hand(index)), [], num_opponents, samples, seed=seed)
+    return (wins + ties / 2) / done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute preflop equity for every starting hand class")
+    parser.add_argument("--samples", type=int, default=5000, help="samples per class and opponent count")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=TABLE_PATH)
+    args = parser.parse_args()
+
+    jobs = [(index, num_opponents, args.samples, args.seed * 10007 + index * MAX_OPPONENTS + num_opponents)
+            for index in range(NUM_CLASSES) for num_opponents in range(1, MAX_OPPONENTS + 1)]
+    with ProcessPoolExecutor(args.workers) as pool:
+        equities = list(pool.map(class_equity, jobs, chunksize=MAX_OPPONENTS))
+
+    write_table(args.output, equities)
+    for index in range(NUM_CLASSES):
+        row = equities[index * MAX_OPPONENTS:(index + 1) * MAX_OPPONENTS]
+        print(class_name(index), " ".join("{:.3f}".format(e) for e in row))
+
+
+if __name__ == "__main__":
+    main()
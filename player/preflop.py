@@ -0,0 +1,75 @@
+import mmap
+import struct
+import sys
+from array import array
+from os.path import dirname, join
+from typing import List, Tuple, Callable, Union
+
+from dealer.evaluator import RANK_OF_CODE, SUIT_OF_CODE
+
+TABLE_PATH = join(dirname(__file__), "preflop_equity.bin")
+MAGIC = b"PFEQ"
+HEADER = struct.Struct("<4sBB")
+NUM_CLASSES = 169
+MAX_OPPONENTS = 9
+
+
+def class_index(first: int, second: int) -> int:
+    high, low = sorted((RANK_OF_CODE[first], RANK_OF_CODE[second]), reverse=True)
+    if SUIT_OF_CODE[first] == SUIT_OF_CODE[second]:
+        return high * 13 + low
+    return low * 13 + high
+
+
+def class_hand(index: int) -> Tuple[int, int]:
+    row, col = divmod(index, 13)
+    high, low = max(row, col), min(row, col)
+    second_suit = 0 if row > col else 1
+    return (high + 1) % 13, second_suit * 13 + (low + 1) % 13
+
+
+def class_name(index: int) -> str:
+    names = "23456789TJQKA"
+    row, col = divmod(index, 13)
+    name = names[max(row, col)] + names[min(row, col)]
+    if row > col:
+        return name + "s"
+    if row < col:
+        return name + "o"
+    return name
+
+
+def write_table(path: str, equities: List[float], max_opponents=MAX_OPPONENTS):
+    table = array("f", equities)
+    if sys.byteorder != "little":
+        table.byteswap()
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, NUM_CLASSES, max_opponents))
+        table.tofile(f)
+
+
+def read_table(path=TABLE_PATH) -> Tuple[Union[array, memoryview], int]:
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, num_classes, max_opponents = HEADER.unpack_from(mapped)
+    if magic != MAGIC or num_classes != NUM_CLASSES:
+        raise Exception("{} is not a preflop equity table".format(path))
+    data = memoryview(mapped)[HEADER.size:]
+    if sys.byteorder == "little" and len(data) % 4 == 0:
+        table = data.cast("f")
+    else:
+        table = array("f", data.tobytes()[:len(data) - len(data) % 4])
+        if sys.byteorder != "little":
+            table.byteswap()
+    if len(table) != NUM_CLASSES * max_opponents:
+        raise Exception("{} is truncated".format(path))
+    return table, max_opponents
+
+
+def from_file(path=TABLE_PATH) -> Callable[[int, int, int], float]:
+    table, max_opponents = read_table(path)
+
+    def func(first: int, second: int, num_opponents: int) -> float:
+        num_opponents = min(max(num_opponents, 1), max_opponents)
+        return table[class_index(first, second) * max_opponents + num_opponents - 1]
+    return func
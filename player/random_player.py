@@ -11,8 +11,8 @@ def decide_action(game_status: GameStatus, raise_available=True):
     return result
 
 
-def random_player(verbose=True):
-    return PokerPlayer(decide_action, verbose=verbose)
+def random_player(verbose=True, player_class=PokerPlayer, player_name=None):
+    return player_class(decide_action, player_name=player_name, verbose=verbose)
 
 
 def main():
@@ -0,0 +1,180 @@
+import argparse
+from typing import List, Tuple, Optional
+
+import numpy as np
+
+from dealer.batch_evaluator import evaluate_batch
+from dealer.evaluator import MAX_RANK, RANK_OF_CODE, SUIT_OF_CODE
+from . import preflop
+
+RANKS = np.array(RANK_OF_CODE, dtype=np.int64)
+SUITS = np.array(SUIT_OF_CODE, dtype=np.int64)
+
+Strategy = Tuple[float, float]
+
+
+class Tables:
+    """The state of one betting hand at each of N tables, one row per table and one column per seat."""
+
+    def __init__(self, hole: np.ndarray, board: np.ndarray, fold: np.ndarray, call: np.ndarray, stack: int):
+        self.hole = hole
+        self.board = board
+        self.fold_threshold = fold
+        self.call_threshold = call
+        self.num_tables, self.num_seats = fold.shape
+        self.holdings = np.full((self.num_tables, self.num_seats), stack, dtype=np.int64)
+        self.bet_amount = np.zeros((self.num_tables, self.num_seats), dtype=np.int64)
+        self.folded = np.zeros((self.num_tables, self.num_seats), dtype=bool)
+
+    def bet(self, seat: int, amount: np.ndarray, where: np.ndarray):
+        amount = np.where(where, amount, 0)
+        self.holdings[:, seat] -= amount
+        self.bet_amount[:, seat] += amount
+
+    def active_count(self) -> np.ndarray:
+        return (~self.folded & (self.holdings > 0)).sum(axis=1)
+
+
+def preflop_table() -> np.ndarray:
+    table, max_opponents = preflop.read_table()
+    return np.asarray(table, dtype=np.float64).reshape(preflop.NUM_CLASSES, max_opponents)
+
+
+def class_indices(hole: np.ndarray) -> np.ndarray:
+    ranks = RANKS[hole]
+    high = ranks.max(axis=-1)
+    low = ranks.min(axis=-1)
+    suited = SUITS[hole[..., 0]] == SUITS[hole[..., 1]]
+    return np.where(suited, high * 13 + low, low * 13 + high)
+
+
+def street_ranks(tables: Tables, num_board: int) -> np.ndarray:
+    cards = np.concatenate([tables.hole, np.repeat(tables.board[:, None, :num_board], tables.num_seats, axis=1)],
+                           axis=2)
+    return evaluate_batch(cards.reshape(-1, cards.shape[2])).reshape(tables.num_tables, tables.num_seats)
+
+
+def street_confidence(tables: Tables, num_board: int) -> np.ndarray:
+    return street_ranks(tables, num_board) / MAX_RANK
+
+
+def run_bet_round(tables: Tables, confidence, start_pos: int, blinds: Optional[Tuple[int, int]]):
+    # Mirrors Hand.run_bet_round: players act in seat order from start_pos, each may raise once per round,
+    # and a raise moves the end of the round to the seat before the raiser.
+    n = tables.num_seats
+    if blinds is not None:
+        small_blind, big_blind = blinds
+        tables.bet((start_pos - 1) % n, np.minimum(big_blind, tables.holdings[:, (start_pos - 1) % n]), True)
+        if n > 2:
+            tables.bet((start_pos - 2) % n, np.minimum(small_blind, tables.holdings[:, (start_pos - 2) % n]), True)
+
+    has_bet = np.zeros((tables.num_tables, n), dtype=bool)
+    round_end = np.full(tables.num_tables, (start_pos - 1) % n)
+    running = tables.active_count() > 1
+    index = start_pos
+    for _ in range(3 * n):
+        if not running.any():
+            break
+        acting = running & ~tables.folded[:, index] & (tables.holdings[:, index] > 0)
+        conf = confidence(tables, index)
+        pot_bet = tables.bet_amount.max(axis=1)
+        your_bet = tables.bet_amount[:, index]
+        holdings = tables.holdings[:, index]
+        to_call = pot_bet - your_bet
+        raise_available = ~has_bet[:, index] & (holdings > to_call)
+
+        possible = holdings + your_bet - pot_bet
+        amount = np.round(possible * conf * 0.5 * (1 + np.exp(np.minimum(-possible + 1, 50))))
+        folds = acting & (conf < tables.fold_threshold[:, index])
+        raises = acting & ~folds & raise_available & (conf >= tables.call_threshold[:, index]) & (amount > 0)
+        calls = acting & ~folds & ~raises
+
+        tables.folded[:, index] |= folds
+        tables.bet(index, np.minimum(to_call, holdings), calls)
+        tables.bet(index, to_call + amount.astype(np.int64), raises)
+        has_bet[:, index] |= acting
+        round_end = np.where(raises, (index - 1) % n, round_end)
+
+        running &= (round_end != index) & (tables.active_count() > 1)
+        index = (index + 1) % n
+
+
+def resolve_pots(tables: Tables) -> np.ndarray:
+    # Mirrors Hand.decide_winner: each side pot is shared between the best non-folded hands that paid into it,
+    # with the integer division remainder lost as it is at the dealer.
+    ranks = np.where(tables.folded, -1, street_ranks(tables, 5))
+    contributions = tables.bet_amount
+    levels = np.sort(contributions, axis=1)
+    winnings = np.zeros_like(contributions)
+    previous = np.zeros(tables.num_tables, dtype=np.int64)
+    for level_index in range(tables.num_seats):
+        level = levels[:, level_index]
+        pot = (np.minimum(contributions, level[:, None]) - np.minimum(contributions, previous[:, None])).sum(axis=1)
+        eligible_ranks = np.where(contributions >= level[:, None], ranks, -1)
+        best = eligible_ranks.max(axis=1)
+        winners = (eligible_ranks == best[:, None]) & (best[:, None] >= 0)
+        num_winners = winners.sum(axis=1)
+        share = np.where(num_winners > 0, pot // np.maximum(num_winners, 1), 0)
+        winnings += np.where(winners, share[:, None], 0)
+        previous = level
+    return winnings
+
+
+def simulate_batch(rng: np.random.Generator, strategies: List[Strategy], num_hands: int, stack: int,
+                   blinds: Tuple[int, int], preflop_equity: np.ndarray) -> np.ndarray:
+    n = len(strategies)
+    decks = rng.random((num_hands, 52)).argsort(axis=1)
+    hole = decks[:, :2 * n].reshape(num_hands, n, 2)
+    board = decks[:, 2 * n:2 * n + 5]
+
+    # Seat s at table t plays strategy (s + t) % n, so every strategy sits in every seat equally often.
+    seat_strategy = (np.arange(n)[None, :] + np.arange(num_hands)[:, None]) % n
+    thresholds = np.array(strategies, dtype=np.float64)
+    tables = Tables(hole, board, thresholds[seat_strategy, 0], thresholds[seat_strategy, 1], stack)
+
+    classes = class_indices(hole)
+
+    def preflop_confidence(t: Tables, seat: int) -> np.ndarray:
+        opponents = np.clip((~t.folded).sum(axis=1) - 1, 1, preflop_equity.shape[1])
+        return preflop_equity[classes[:, seat], opponents - 1]
+
+    run_bet_round(tables, preflop_confidence, 0, blinds)
+    for num_board in (3, 4, 5):
+        confidence = street_confidence(tables, num_board)
+        run_bet_round(tables, lambda t, seat: confidence[:, seat], 0, None)
+
+    net = resolve_pots(tables) - tables.bet_amount
+    totals = np.zeros(n, dtype=np.float64)
+    np.add.at(totals, seat_strategy.ravel(), net.ravel())
+    return totals
+
+
+def simulate(strategies: List[Strategy], num_hands: int, seed: Optional[int] = None, stack=100,
+             blinds=(5, 10), batch_size=20000) -> np.ndarray:
+    # Every hand starts from fresh stacks, so the result is each strategy's mean net chips per hand rather than
+    # its chance of winning a whole game.
+    rng = np.random.default_rng(seed)
+    preflop_equity = preflop_table()
+    totals = np.zeros(len(strategies), dtype=np.float64)
+    done = 0
+    while done < num_hands:
+        size = min(batch_size, num_hands - done)
+        totals += simulate_batch(rng, strategies, size, stack, blinds, preflop_equity)
+        done += size
+    return totals / num_hands
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play heuristic strategies against each other in batch")
+    parser.add_argument("strategies", nargs="+", help="fold,call threshold pairs, e.g. 0.3,0.6")
+    parser.add_argument("--hands", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    strategies = [tuple(float(x) for x in strategy.split(",")) for strategy in args.strategies]
+    for strategy, result in zip(strategies, simulate(strategies, args.hands, seed=args.seed)):
+        print("fold {:.2f} call {:.2f}: {:+.3f} per hand".format(strategy[0], strategy[1], result))
+
+
+if __name__ == "__main__":
+    main()
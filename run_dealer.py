@@ -1,4 +1,4 @@
-from dealer.main import run_game_for_n_players
+from dealer.main import run_game_for_n_players, run_match_for_n_players
 
 
 def main():
@@ -9,7 +9,16 @@ def main():
             break
         print("must have more than one player")
 
-    run_game_for_n_players(num_players)
+    while True:
+        num_games = int(input("# games: "))
+        if num_games > 0:
+            break
+        print("must play at least one game")
+
+    if num_games == 1:
+        run_game_for_n_players(num_players)
+    else:
+        run_match_for_n_players(num_players, num_games)
 
 
 if __name__ == "__main__":
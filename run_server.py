@@ -0,0 +1,16 @@
+from dealer.server import run_server
+
+
+def main():
+
+    while True:
+        num_players = int(input("# players per table: "))
+        if num_players > 1:
+            break
+        print("must have more than one player")
+
+    run_server(num_players)
+
+
+if __name__ == "__main__":
+    main()
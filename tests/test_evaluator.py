@@ -0,0 +1,89 @@
+import random
+from collections import Counter
+from itertools import combinations
+from typing import Dict, List, Tuple
+
+import pytest
+
+from dealer.cards import card_codes
+from dealer.evaluator import evaluate, rank_trick_code, IncrementalEvaluator, HIGH_CARD, PAIR, TWO_PAIR, \
+    THREE_OF_A_KIND, STRAIGHT, FLUSH, FULL_HOUSE, FOUR_OF_A_KIND, STRAIGHT_FLUSH
+
+HANDS_PER_SIZE = 3000
+
+
+def reference_five(cards: List[int]) -> Tuple[int, Tuple[int, ...]]:
+    """Scores exactly five cards the long way, as (trick code, ranks to compare in order) with aces high."""
+    ranks = [(card % 13 - 1) % 13 for card in cards]
+    is_flush = len({card // 13 for card in cards}) == 1
+    unique = sorted(set(ranks), reverse=True)
+    straight = None
+    if len(unique) == 5 and unique[0] - unique[4] == 4:
+        straight = unique[0]
+    elif unique == [12, 3, 2, 1, 0]:
+        straight = 3
+    groups = sorted(Counter(ranks).items(), key=lambda x: (x[1], x[0]), reverse=True)
+    by_group = tuple(rank for rank, _ in groups)
+    sizes = [size for _, size in groups]
+
+    if straight is not None and is_flush:
+        return STRAIGHT_FLUSH, (straight,)
+    if sizes[0] == 4:
+        return FOUR_OF_A_KIND, by_group
+    if sizes == [3, 2]:
+        return FULL_HOUSE, by_group
+    if is_flush:
+        return FLUSH, tuple(unique)
+    if straight is not None:
+        return STRAIGHT, (straight,)
+    if sizes[0] == 3:
+        return THREE_OF_A_KIND, by_group
+    if sizes[:2] == [2, 2]:
+        return TWO_PAIR, by_group
+    if sizes[0] == 2:
+        return PAIR, by_group
+    return HIGH_CARD, tuple(unique)
+
+
+def reference(cards: List[int]) -> Tuple[int, Tuple[int, ...]]:
+    return max(reference_five(list(five)) for five in combinations(cards, 5))
+
+
+def deal(num_cards: int) -> List[List[int]]:
+    rng = random.Random(num_cards)
+    return [rng.sample(card_codes, num_cards) for _ in range(HANDS_PER_SIZE)]
+
+
+@pytest.mark.parametrize("num_cards", [5, 6, 7])
+def test_evaluate_orders_hands_like_best_of_combinations(num_cards):
+    values: Dict[Tuple, set] = {}
+    for cards in deal(num_cards):
+        expected = reference(cards)
+        value = evaluate(cards)
+        assert rank_trick_code(value) == expected[0], cards
+        values.setdefault(expected, set()).add(value)
+
+    # equal reference scores must get one value, and better reference scores strictly higher ones
+    ordered = [values[key] for key in sorted(values)]
+    assert all(len(group) == 1 for group in ordered)
+    ordered_values = [min(group) for group in ordered]
+    assert ordered_values == sorted(set(ordered_values))
+
+
+@pytest.mark.parametrize("num_cards", [5, 6, 7])
+def test_incremental_evaluator_matches_evaluate(num_cards):
+    for cards in deal(num_cards):
+        evaluator = IncrementalEvaluator(cards[:2])
+        for card in cards[2:]:
+            evaluator.push(card)
+        assert evaluator.best == evaluate(cards)
+        assert evaluator.copy().best == evaluator.best
+
+
+@pytest.mark.parametrize("num_cards", [5, 6, 7])
+def test_evaluate_batch_matches_evaluate(num_cards):
+    np = pytest.importorskip("numpy")
+    from dealer.batch_evaluator import evaluate_batch
+
+    hands = deal(num_cards)
+    assert evaluate_batch(np.array(hands)).tolist() == [evaluate(cards) for cards in hands]
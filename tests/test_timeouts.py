@@ -0,0 +1,77 @@
+import threading
+import time
+from typing import List
+
+import pytest
+
+from dealer.endpoints import socketpairs
+from dealer.game import Game
+from dealer.limits import ActionLimits
+from dealer.main import seat_connections
+
+ACTION_TIME = 0.5
+OTHERS_DELAY = 0.3  # both other players take this long, so a reply 0.7s late arrives before the next prompt
+LATE_DELAY = 0.7
+
+
+class ScriptedClient:
+    """A text protocol client that calls every time, except for its first prompt on the flop, which it answers
+    with Fold after LATE_DELAY ("late") or never answers at all ("never")."""
+
+    def __init__(self, conn, name: str, mode: str, delay=0.0):
+        self.conn = conn
+        self.name = name
+        self.mode = mode
+        self.delay = delay
+        self.lines: List[str] = []
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while not self.conn.recv(4096).endswith(b": "):
+            pass
+        self.conn.sendall((self.name + "\n").encode("utf8"))
+        seen_flop = skipped = False
+        for line in self.conn.makefile("r", encoding="utf8"):
+            line = line.strip()
+            self.lines.append(line)
+            if line.startswith("Reveal 3"):
+                seen_flop = True
+            if line == "Goodbye":
+                break
+            if not line.startswith("Fold/Call"):
+                continue
+            if seen_flop and not skipped and self.mode != "steady":
+                skipped = True
+                if self.mode == "late":
+                    time.sleep(LATE_DELAY)
+                    self.conn.sendall(b"Fold\n")
+                continue
+            time.sleep(self.delay)
+            self.conn.sendall(b"Call\n")
+
+    def count(self, prefix: str) -> int:
+        return len([line for line in self.lines if line.startswith(prefix)])
+
+
+@pytest.mark.parametrize("mode", ["late", "never"])
+def test_player_recovers_after_missing_a_prompt(mode):
+    dealer_ends, player_ends = socketpairs(3)
+    clients = [ScriptedClient(player_ends[0], "subject", mode)] + \
+        [ScriptedClient(conn, "steady{}".format(i), "steady", OTHERS_DELAY) for i, conn in enumerate(player_ends[1:])]
+    players = seat_connections(dealer_ends, 3, verbose=False)
+    game = Game(players, verbose=False, seed=1, limits=ActionLimits(action_time=ACTION_TIME))
+    game.run_hand()
+    for player in players:
+        player.coms.close()
+    for client in clients:
+        client.thread.join(10)
+
+    subject = clients[0]
+    assert subject.count("Fold/Call") >= 3
+    # only the skipped prompt is acted on by the dealer, which checks as there is nothing to call after the
+    # preflop calls, and every later prompt is answered in time rather than the late Fold being taken for it
+    assert subject.count("Auto action: Call (timed out)") == 1
+    assert subject.count("Auto action") == 1
+    assert subject.count("SUCCESS") == subject.count("Fold/Call") - 1
+    assert subject.count("You have folded") == 0